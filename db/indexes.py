@@ -0,0 +1,62 @@
+from pymongo import IndexModel
+
+# 索引定义只在这里维护一份：应用启动时的create_indexes与scripts下的初始化脚本共用，避免两边不一致
+
+# 名称唯一索引（导入脚本按name做upsert匹配）
+UNIVERSITY_NAME_INDEX = IndexModel([("name", 1)], unique=True)
+
+# 美国大学集合的查询索引
+# country/rank/strengths/type的单字段查询由同前缀的复合索引覆盖，不再单独建索引
+UNIVERSITY_INDEXES = [
+    # 按国家筛选+排名排序的分页查询（最常见的前端查询）
+    IndexModel([("country", 1), ("rank", 1)]),
+    IndexModel([("strengths", 1), ("rank", 1)]),
+    IndexModel([("type", 1), ("rank", 1)]),
+    IndexModel([("tuition", 1)]),
+    IndexModel([("schoolSize", 1)]),
+    IndexModel([("tags", 1)]),
+
+    # 新增字段索引
+    IndexModel([("supports_ed", 1)]),
+    IndexModel([("supports_ea", 1)]),
+    IndexModel([("supports_rd", 1)]),
+    IndexModel([("internship_support_score", 1)]),
+    IndexModel([("acceptanceRate", 1)]),
+    IndexModel([("intlRate", 1)]),
+    IndexModel([("state", 1)]),
+    IndexModel([("personality_types", 1)]),
+
+    # 匹配get_universities筛选组合的复合索引，以及name/strengths文本索引（用于$text搜索）
+    IndexModel([("country", 1), ("type", 1), ("rank", 1), ("tuition", 1)]),
+    IndexModel([("name", "text"), ("strengths", "text")]),
+    # 名称前缀搜索（小写）
+    IndexModel([("name_lc", 1)]),
+    # keyset分页按(rank, _id)排序翻页
+    IndexModel([("rank", 1), ("_id", 1)]),
+]
+
+# 国际大学集合：排名排序与keyset分页，以及列表接口各筛选字段+(rank, _id)的复合索引，
+# 等值筛选后可直接按索引顺序返回，无需内存排序
+INTL_FILTER_FIELDS = {
+    "university_au": ["city", "group_of_eight", "work_integrated_learning", "strengths"],
+    "university_uk": ["city", "russell_group", "foundation_available", "placement_year_available", "strengths"],
+    "university_sg": ["tuition_grant_available", "strengths"],
+}
+
+def intl_indexes(coll_name):
+    """国际大学集合的查询索引"""
+    return [
+        IndexModel([("rank", 1), ("_id", 1)]),
+        IndexModel([("tags", 1)]),
+        *[IndexModel([(field, 1), ("rank", 1), ("_id", 1)]) for field in INTL_FILTER_FIELDS[coll_name]],
+    ]
+
+USER_INDEXES = [IndexModel([("created_at", 1)])]
+
+# 家长评估与学生测试结果
+# user_id单独查询由(user_id, created_at, _id)复合索引按前缀覆盖，不再单独建索引
+EVALUATION_INDEXES = [
+    IndexModel([("created_at", 1)]),
+    # 按用户列出评估并按(created_at, _id)倒序翻页
+    IndexModel([("user_id", 1), ("created_at", -1), ("_id", -1)]),
+]
@@ -1,7 +1,13 @@
 import os
-from motor.motor_asyncio import AsyncIOMotorClient
+import json
+from pymongo import AsyncMongoClient
+from pymongo.errors import OperationFailure
 from dotenv import load_dotenv
 
+from db.indexes import (
+    EVALUATION_INDEXES, INTL_FILTER_FIELDS, UNIVERSITY_INDEXES, UNIVERSITY_NAME_INDEX, USER_INDEXES, intl_indexes,
+)
+
 # Load environment variables
 load_dotenv()
 
@@ -10,6 +16,10 @@ MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017")
 DATABASE_NAME = "university_matcher"
 MOCK_MODE = os.getenv("MOCK_MODE", "false").lower() == "true"
 
+# 连接池配置：列表页并发读取较多，放大连接池上限并预留常驻连接，避免突发请求排队建连
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "200"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "20"))
+
 # Debug: Print environment variables (remove in production)
 print(f"🔍 Environment Debug:")
 print(f"   MONGO_URL: {MONGO_URL[:50]}..." if len(MONGO_URL) > 50 else f"   MONGO_URL: {MONGO_URL}")
@@ -34,7 +44,15 @@ async def connect_to_mongo():
         print(f"🔌 Attempting to connect to MongoDB...")
         print(f"   URL: {MONGO_URL[:50]}..." if len(MONGO_URL) > 50 else f"   URL: {MONGO_URL}")
         
-        client = AsyncIOMotorClient(MONGO_URL)
+        client = AsyncMongoClient(
+            MONGO_URL,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            # 连接池耗尽时尽快失败，而不是长时间挂起请求
+            waitQueueTimeoutMS=2500,
+            # 突发流量后多出的空闲连接1分钟后回收，常驻连接数保持minPoolSize
+            maxIdleTimeMS=60000,
+        )
         db = client[DATABASE_NAME]
         
         # Test connection first
@@ -59,6 +77,13 @@ def get_db():
     """获取数据库实例"""
     return db
 
+# 早期版本创建的单字段索引，已被(country, rank)/(rank, _id)/(strengths, rank)/(type, rank)按前缀覆盖；
+# school_size_1是导入脚本按错误字段名建的索引（实际字段为schoolSize）
+_REDUNDANT_UNIVERSITY_INDEXES = frozenset({"country_1", "rank_1", "strengths_1", "type_1", "school_size_1"})
+
+# 早期版本的user_id单字段索引，已被(user_id, created_at, _id)复合索引按前缀覆盖
+_REDUNDANT_EVALUATION_INDEXES = frozenset({"user_id_1"})
+
 async def create_indexes():
     """创建数据库索引"""
     try:
@@ -71,55 +96,70 @@ async def create_indexes():
         
         # 用户集合索引
         try:
-            db.users.create_index("created_at")
+            await db.users.create_indexes(USER_INDEXES)
             print("✅ 用户索引创建完成")
         except Exception as e:
             print(f"⚠️  用户索引创建跳过: {e}")
         
         # 大学集合索引 - 先清理可能冲突的索引
         try:
-            # 删除可能冲突的索引
-            existing_indexes = await db.universities.list_indexes().to_list(None)
+            # 旧的name_1若不是唯一索引会与下面的唯一索引冲突，只在这种情况下删除
+            existing_indexes = await (await db.universities.list_indexes()).to_list(None)
             for index in existing_indexes:
-                if index.get("name") == "name_1":
+                if index.get("name") == "name_1" and not index.get("unique"):
                     try:
                         await db.universities.drop_index("name_1")
                         print("🔄 删除旧名称索引")
                     except:
                         pass
-                    break
+                elif index.get("name") in _REDUNDANT_UNIVERSITY_INDEXES:
+                    # 冗余或字段名错误的旧索引，只会拖慢写入
+                    try:
+                        await db.universities.drop_index(index["name"])
+                        print(f"🔄 删除冗余索引 {index['name']}")
+                    except Exception:
+                        pass
             
-            # 创建新索引
-            db.universities.create_index("name", unique=True)
-            db.universities.create_index("country")
-            db.universities.create_index("rank")
-            db.universities.create_index([("country", 1), ("rank", 1)])
-            db.universities.create_index("strengths")
-            db.universities.create_index("tuition")
-            db.universities.create_index("type")
-            db.universities.create_index("schoolSize")
-            db.universities.create_index("tags")
+            # 小写名称用于左锚定前缀搜索（可走索引），先为缺少该字段的旧数据补齐name_lc
+            await db.universities.update_many(
+                {"name_lc": {"$exists": False}},
+                [{"$set": {"name_lc": {"$toLower": "$name"}}}]
+            )
             
-            # 新增字段索引
-            db.universities.create_index("supports_ed")
-            db.universities.create_index("supports_ea")
-            db.universities.create_index("supports_rd")
-            db.universities.create_index("internship_support_score")
-            db.universities.create_index("acceptanceRate")
-            db.universities.create_index("intlRate")
-            db.universities.create_index("state")
-            db.universities.create_index("personality_types")
+            # 唯一索引单独创建：历史数据有重名时只让它失败，不拖累其它索引
+            try:
+                await db.universities.create_indexes([UNIVERSITY_NAME_INDEX])
+            except Exception as e:
+                print(f"⚠️  名称唯一索引创建跳过: {e}")
+            
+            # 一次请求批量创建其余索引（已存在的索引为no-op，索引列表见db/indexes.py）
+            await db.universities.create_indexes(UNIVERSITY_INDEXES)
             
             print("✅ 大学索引创建完成")
         except Exception as e:
             print(f"⚠️  大学索引创建跳过: {e}")
         
+        # 国际大学集合索引
+        try:
+            for coll_name in INTL_FILTER_FIELDS:
+                await getattr(db, coll_name).create_indexes(intl_indexes(coll_name))
+            print("✅ 国际大学索引创建完成")
+        except Exception as e:
+            print(f"⚠️  国际大学索引创建跳过: {e}")
+        
         # 评估结果索引
         try:
-            db.parent_evaluations.create_index("user_id")
-            db.parent_evaluations.create_index("created_at")
-            db.student_personality_tests.create_index("user_id")
-            db.student_personality_tests.create_index("created_at")
+            for collection in (db.parent_evaluations, db.student_personality_tests):
+                await collection.create_indexes(EVALUATION_INDEXES)
+                # 删除已被复合索引覆盖的旧索引，只会拖慢写入
+                existing_indexes = await (await collection.list_indexes()).to_list(None)
+                for index in existing_indexes:
+                    if index.get("name") in _REDUNDANT_EVALUATION_INDEXES:
+                        try:
+                            await collection.drop_index(index["name"])
+                            print(f"🔄 删除冗余索引 {collection.name}.{index['name']}")
+                        except Exception:
+                            pass
             print("✅ 评估索引创建完成")
         except Exception as e:
             print(f"⚠️  评估索引创建跳过: {e}")
@@ -133,7 +173,7 @@ async def create_indexes():
 async def close_mongo_connection():
     """关闭MongoDB连接"""
     if db is not None and not MOCK_MODE:
-        db.client.close()
+        await db.client.close()
         print("MongoDB连接已关闭")
     elif MOCK_MODE:
         print("🔧 Mock mode - no connection to close")
@@ -161,6 +201,7 @@ class MockDatabase:
             {
                 "_id": "mock_1",
                 "name": "Harvard University",
+                "name_lc": "harvard university",
                 "country": "USA",
                 "state": "Massachusetts",
                 "rank": 1,
@@ -174,6 +215,7 @@ class MockDatabase:
             {
                 "_id": "mock_2", 
                 "name": "Stanford University",
+                "name_lc": "stanford university",
                 "country": "USA",
                 "state": "California",
                 "rank": 2,
@@ -236,6 +278,10 @@ class MockCollection:
         """Mock index creation"""
         pass
     
+    async def create_indexes(self, indexes):
+        """Mock batch index creation"""
+        return []
+    
     async def insert_one(self, document):
         """Mock insert operation"""
         doc_id = f"mock_id_{len(self.data)}"
@@ -243,7 +289,7 @@ class MockCollection:
         self.data.append(document)
         return type('MockResult', (), {'inserted_id': doc_id})()
     
-    async def find_one(self, query):
+    async def find_one(self, query, projection=None):
         """Mock find one operation"""
         for doc in self.data:
             match = True
@@ -259,7 +305,7 @@ class MockCollection:
                     match = False
                     break
             if match:
-                return doc
+                return self._project(doc, projection) if projection else doc
         return None
     
     def find(self, query=None, projection=None):
@@ -271,21 +317,23 @@ class MockCollection:
         for doc in self.data:
             if self._match_query(doc, query):
                 # Apply projection if provided
-                if projection:
-                    projected_doc = {}
-                    for field, include in projection.items():
-                        if include == 1 or include is True:
-                            # Include only specified fields
-                            if field in doc:
-                                projected_doc[field] = doc[field]
-                    # Always include _id unless explicitly excluded
-                    if "_id" not in projection or projection.get("_id", 1) != 0:
-                        projected_doc["_id"] = doc.get("_id")
-                    results.append(projected_doc)
-                else:
-                    results.append(doc)
+                results.append(self._project(doc, projection) if projection else doc)
         return MockCursor(results)
     
+    @staticmethod
+    def _project(doc, projection):
+        """Apply an inclusion projection to a document"""
+        projected_doc = {}
+        for field, include in projection.items():
+            if include == 1 or include is True:
+                # Include only specified fields
+                if field in doc:
+                    projected_doc[field] = doc[field]
+        # Always include _id unless explicitly excluded
+        if "_id" not in projection or projection.get("_id", 1) != 0:
+            projected_doc["_id"] = doc.get("_id")
+        return projected_doc
+    
     def _match_query(self, doc, query):
         """Check if document matches query (supports basic MongoDB operators)"""
         if not query:
@@ -300,16 +348,34 @@ class MockCollection:
                 # Handle $and operator
                 if not all(self._match_query(doc, condition) for condition in v):
                     return False
+            elif k == "$text":
+                # Approximate a text index over name/strengths with case-insensitive term matching
+                terms = str(v.get("$search", "")).lower().split()
+                strengths = doc.get("strengths") or []
+                if not isinstance(strengths, list):
+                    strengths = [strengths]
+                haystack = " ".join([str(doc.get("name", ""))] + [str(s) for s in strengths]).lower()
+                if not any(term in haystack for term in terms):
+                    return False
             elif isinstance(v, dict):
-                # Handle operators like $in, $gte, $lte, $regex
+                # Handle operators like $in, $gt, $gte, $lt, $lte, $regex
                 if "$in" in v:
                     if doc.get(k) not in v["$in"]:
                         return False
-                elif "$gte" in v:
-                    if doc.get(k, 0) < v["$gte"]:
+                elif "$ne" in v:
+                    if doc.get(k) == v["$ne"]:
+                        return False
+                elif any(op in v for op in ("$gt", "$gte", "$lt", "$lte")):
+                    # Range operators never match null/missing values
+                    if doc.get(k) is None:
+                        return False
+                    if "$gt" in v and not doc.get(k) > v["$gt"]:
+                        return False
+                    if "$gte" in v and doc.get(k) < v["$gte"]:
                         return False
-                elif "$lte" in v:
-                    if doc.get(k, float('inf')) > v["$lte"]:
+                    if "$lt" in v and not doc.get(k) < v["$lt"]:
+                        return False
+                    if "$lte" in v and doc.get(k) > v["$lte"]:
                         return False
                 elif "$regex" in v:
                     import re
@@ -356,11 +422,48 @@ class MockCollection:
             return type('MockResult', (), {'deleted_count': deleted_count})()
         return type('MockResult', (), {'deleted_count': 0})()
     
-    async def distinct(self, field):
+    async def aggregate(self, pipeline, **kwargs):
+        """Mock aggregate operation (supports $match/$sort/$skip/$limit/$project/$count/$facet)"""
+        return MockCursor(self._run_pipeline(list(self.data), pipeline))
+    
+    @classmethod
+    def _check_aggregate_match(cls, query):
+        """Reject $text nested in $or/$not like a real server does for aggregation $match"""
+        for k, v in query.items():
+            if k in ("$or", "$not", "$nor"):
+                if "$text" in json.dumps(v, default=str):
+                    raise OperationFailure("$text is not allowed in this context", code=2)
+            elif k == "$and":
+                for condition in v:
+                    cls._check_aggregate_match(condition)
+
+    def _run_pipeline(self, docs, pipeline):
+        for stage in pipeline:
+            (op, spec), = stage.items()
+            if op == "$match":
+                self._check_aggregate_match(spec)
+                docs = [doc for doc in docs if self._match_query(doc, spec)]
+            elif op == "$sort":
+                docs = MockCursor(list(docs)).sort(list(spec.items())).data
+            elif op == "$skip":
+                docs = docs[spec:]
+            elif op == "$limit":
+                docs = docs[:spec]
+            elif op == "$project":
+                docs = [self._project(doc, spec) for doc in docs]
+            elif op == "$count":
+                docs = [{spec: len(docs)}] if docs else []
+            elif op == "$facet":
+                docs = [{name: self._run_pipeline(list(docs), sub) for name, sub in spec.items()}]
+            else:
+                raise NotImplementedError(f"Mock aggregate does not support {op}")
+        return docs
+    
+    async def distinct(self, field, filter=None):
         """Mock distinct operation"""
         values = set()
         for doc in self.data:
-            if field in doc:
+            if field in doc and self._match_query(doc, filter):
                 val = doc[field]
                 # Handle list values (e.g., strengths)
                 if isinstance(val, list):
@@ -369,10 +472,15 @@ class MockCollection:
                     values.add(val)
         return list(values)
     
-    async def count_documents(self, query=None):
-        """Mock count_documents operation"""
+    async def estimated_document_count(self):
+        """Mock estimated_document_count operation"""
+        return len(self.data)
+    
+    async def count_documents(self, query=None, **kwargs):
+        """Mock count_documents operation (runs as an aggregation $match on a real server)"""
         if query is None:
             query = {}
+        self._check_aggregate_match(query)
         count = 0
         for doc in self.data:
             if self._match_query(doc, query):
@@ -392,12 +500,13 @@ class MockCursor:
             return self.data
         return self.data[:length]
     
-    def sort(self, field, direction):
-        """Mock sort operation"""
-        if direction == -1:
-            self.data.sort(key=lambda x: x.get(field, ''), reverse=True)
-        else:
-            self.data.sort(key=lambda x: x.get(field, ''))
+    def sort(self, field, direction=1):
+        """Mock sort operation (supports a single field or a list of (field, direction))"""
+        keys = field if isinstance(field, list) else [(field, direction)]
+        # 依次按次要键到主要键排序，利用稳定排序实现多键排序
+        for key, key_direction in reversed(keys):
+            # 缺失/null值与MongoDB一致，升序时排在最前
+            self.data.sort(key=lambda x: (x.get(key) is not None, x.get(key)), reverse=key_direction == -1)
         return self
     
     def skip(self, count):
@@ -408,4 +517,24 @@ class MockCursor:
     def limit(self, count):
         """Mock limit operation"""
         self.data = self.data[:count]
-        return self
\ No newline at end of file
+        return self
+    
+    def batch_size(self, size):
+        """Mock batch_size operation (no-op)"""
+        return self
+    
+    def max_time_ms(self, max_time_ms):
+        """Mock max_time_ms operation (no-op)"""
+        return self
+    
+    def __aiter__(self):
+        """Mock async iteration"""
+        self.index = 0
+        return self
+    
+    async def __anext__(self):
+        if self.index >= len(self.data):
+            raise StopAsyncIteration
+        doc = self.data[self.index]
+        self.index += 1
+        return doc
\ No newline at end of file
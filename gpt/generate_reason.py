@@ -255,8 +255,8 @@ async def generate_parent_evaluation_summary(
     
     if db is None:
         # 如果全局数据库连接不可用，创建新的连接
-        from motor.motor_asyncio import AsyncIOMotorClient
-        client = AsyncIOMotorClient('mongodb://localhost:27017')
+        from pymongo import AsyncMongoClient
+        client = AsyncMongoClient('mongodb://localhost:27017')
         db = client.university_matcher
     
     # 获取推荐学校的详细信息
@@ -286,17 +286,17 @@ async def generate_parent_evaluation_summary(
     if country == "Australia":
         # 澳洲大学使用专门的提示词构建函数
         from typing import Dict, Any
-        input_dict = input_data.dict() if hasattr(input_data, 'dict') else input_data
+        input_dict = input_data.model_dump() if hasattr(input_data, 'model_dump') else input_data
         prompt = build_au_gpt_prompt(input_dict, schools)
     elif country == "United Kingdom":
         # 英国大学使用专门的提示词构建函数
         from typing import Dict, Any
-        input_dict = input_data.dict() if hasattr(input_data, 'dict') else input_data
+        input_dict = input_data.model_dump() if hasattr(input_data, 'model_dump') else input_data
         prompt = build_uk_gpt_prompt(input_dict, schools)
     elif country == "Singapore":
         # 新加坡大学使用专门的提示词构建函数
         from typing import Dict, Any
-        input_dict = input_data.dict() if hasattr(input_data, 'dict') else input_data
+        input_dict = input_data.model_dump() if hasattr(input_data, 'model_dump') else input_data
         prompt = build_sg_gpt_prompt(input_dict, schools)
     else:
         # 其他国家使用原有提示词
@@ -308,7 +308,7 @@ async def generate_parent_evaluation_summary(
         # 返回默认建议（根据国家不同）
         country = input_data.target_country if hasattr(input_data, 'target_country') else None
         if country == "Australia":
-            input_dict = input_data.dict() if hasattr(input_data, 'dict') else input_data
+            input_dict = input_data.model_dump() if hasattr(input_data, 'model_dump') else input_data
             academic_band = input_dict.get("academic_band", "未提供")
             interests = input_dict.get("interests", [])
             return f"""
@@ -384,7 +384,7 @@ async def generate_parent_evaluation_summary(
         # 如果GPT调用失败，返回默认建议（根据国家不同）
         country = input_data.target_country if hasattr(input_data, 'target_country') else None
         if country == "Australia":
-            input_dict = input_data.dict() if hasattr(input_data, 'dict') else input_data
+            input_dict = input_data.model_dump() if hasattr(input_data, 'model_dump') else input_data
             academic_band = input_dict.get("academic_band", "未提供")
             interests = input_dict.get("interests", [])
             return f"""
@@ -267,8 +267,8 @@ async def recommend_schools_for_parent(input_data: ParentEvaluationInput) -> Lis
     
     if db is None:
         # 如果全局数据库连接不可用，创建新的连接
-        from motor.motor_asyncio import AsyncIOMotorClient
-        client = AsyncIOMotorClient('mongodb://localhost:27017')
+        from pymongo import AsyncMongoClient
+        client = AsyncMongoClient('mongodb://localhost:27017')
         db = client.university_matcher
     
     # 第一步：使用严格模式筛选
@@ -80,6 +80,8 @@ class ParentEvaluation(BaseModel):
     ed_suggestion: Optional[str] = None
     ea_suggestions: List[str] = Field(default_factory=list)
     rd_suggestions: List[str] = Field(default_factory=list)
+    student_profile: Optional[Dict[str, str]] = Field(None, description="学生画像（仅USA，创建时生成）")
+    strategy: Optional[Dict[str, Any]] = Field(None, description="申请策略（仅USA，创建时生成）")
     gpt_summary: str = Field(..., description="GPT生成的评估总结")
     fallback_info: Optional[Dict[str, Any]] = Field(None, description="回退策略信息（仅AU）")  # 新增字段
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Response
 from typing import List, Optional
 from bson import ObjectId
 
 from models.evaluation import ParentEvaluation, ParentEvaluationCreate, ParentEvaluationResponse
 from models.personality import StudentTest, StudentTestCreate, StudentTestResponse
 from db.mongo import get_db
+from utils.cache import TTLCache
+from utils.pagination import CREATED_DESC_SORT, decode_created_cursor, encode_created_cursor
 from gpt.recommend_schools import recommend_schools_for_parent, classify_applications, generate_student_profile, generate_application_strategy
 from gpt.au_evaluation import apply_au_filters_and_score
 from gpt.uk_evaluation import apply_uk_filters_and_score
@@ -13,6 +16,100 @@ from gpt.generate_reason import generate_parent_evaluation_summary
 
 router = APIRouter()
 
+# 评估结果创建后不再变化，按eval_id缓存构建好的响应（进程内L1缓存）
+_EVAL_CACHE_TTL = 3600
+_EVAL_CACHE_MAXSIZE = 1000
+_eval_response_cache = TTLCache(_EVAL_CACHE_TTL, maxsize=_EVAL_CACHE_MAXSIZE)
+
+# 各国申请流程说明与关键信息为固定文案，模块加载时构建一次，各请求共享（只读，不要修改）
+_AU_APPLICATION_GUIDANCE = {
+    "title": "澳洲大学申请流程说明",
+    "steps": (
+        "1. 准备材料：高中成绩单、英语成绩（IELTS/TOEFL/PTE）、个人陈述（部分学校需要）",
+        "2. 选择入学时间：多数学校提供2月和7月入学，部分提供3个学期",
+        "3. 直接申请：通过学校官网或授权代理申请（无需统一系统）",
+        "4. 语言班选项：如英语未达标，可申请语言/过渡课程，通过后进入正课",
+        "5. 接受Offer：收到录取后按要求缴纳押金并办理学生签证",
+        "6. 签证申请：准备资金证明、体检等材料，申请澳洲学生签证"
+    ),
+    "keyPoints": (
+        "申请时间灵活：通常提前3-6个月即可，部分热门专业需更早",
+        "英语成绩：大部分学校接受多种英语考试，可后补（部分专业除外）",
+        "申请费：多数学校申请免费或费用较低（约50-100澳元）"
+    )
+}
+
+_AU_KEY_INFO = {
+    "englishRequirement": "大部分学校要求IELTS 6.5（单项不低于6.0）或同等水平",
+    "intakeTiming": "主要入学时间：2月和7月",
+    "pswInfo": "毕业后可获得2-4年PSW工作签证（取决于学习时长和地区）"
+}
+
+_UK_APPLICATION_GUIDANCE = {
+    "title": "英国大学申请流程说明",
+    "steps": (
+        "1. 准备材料：A-Level/IB成绩、个人陈述（PS）、推荐信、入学测试（如Oxbridge/医学类）",
+        "2. UCAS申请：通过UCAS统一系统提交申请（最多5个志愿）",
+        "3. 申请时间：Oxbridge/医学类10月15日截止，常规路线1月31日截止",
+        "4. Foundation路线：如成绩不足，可先读预科或国际大一，再衔接本科",
+        "5. 等待Offer：收到条件录取或无条件录取",
+        "6. 选择确认：在UCAS上确认最终选择并满足条件",
+        "7. 签证申请：收到CAS后申请英国学生签证"
+    ),
+    "keyPoints": (
+        "UCAS系统：所有英国本科申请必须通过UCAS提交",
+        "申请费：单次申请费约£22.50（1个志愿）或£27（2-5个志愿）",
+        "Personal Statement：所有志愿共用一份，需精心准备",
+        "入学测试：Oxbridge、医学、部分专业需要额外测试（如STEP、BMAT等）",
+        "Foundation：成绩或科目不足时可考虑预科/国际大一，无需UCAS"
+    )
+}
+
+_UK_KEY_INFO = {
+    "ucasInfo": "主要申请时间：Oxbridge/医学类10月15日，常规路线1月31日",
+    "foundationInfo": "如成绩不足，可考虑Foundation/国际大一路线",
+    "visaInfo": "毕业后可申请PSW工作签证（本科/硕士2年，博士3年）"
+}
+
+_SG_APPLICATION_GUIDANCE = {
+    "title": "新加坡大学申请流程说明",
+    "steps": (
+        "1. 准备材料：高中成绩单、英语成绩（IELTS/TOEFL/PTE）、个人陈述、推荐信",
+        "2. 提交申请：通过各大学官网直接申请（无需统一系统）",
+        "3. 申请时间：多数大学10-11月开始接受申请，次年1-3月截止",
+        "4. 面试/作品集：部分专业需要面试、作品集或小论文（需提前准备）",
+        "5. Tuition Grant（TG）：如申请TG，需签约毕业后在新加坡工作若干年",
+        "6. 等待Offer：收到录取通知（有条件/无条件）",
+        "7. 接受Offer：按要求缴纳押金确认录取",
+        "8. 学生签证：申请新加坡学生准证（Student Pass）"
+    ),
+    "keyPoints": (
+        "申请系统：各大学独立申请系统，需分别提交材料",
+        "申请费：多数大学申请费约S$10-50（约USD 7-37）",
+        "TG申请：可在接受Offer后申请Tuition Grant，降低学费但需履行Bond服务期",
+        "面试要求：部分热门专业（如医学、法律、设计）需要面试或作品集",
+        "双学位：部分大学提供双学位项目，需额外申请或满足条件"
+    )
+}
+
+_SG_KEY_INFO = {
+    "tgInfo": "Tuition Grant可大幅降低学费，但需签约在新加坡工作若干年",
+    "applicationTiming": "主要申请时间：10-11月开始，次年1-3月截止",
+    "visaInfo": "学生准证有效期通常覆盖整个学习期间，毕业后可申请工作准证"
+}
+
+def _tuition_range(schools):
+    """单次遍历求推荐学校学费的最小/最大值（忽略缺失或为0的学费），无有效学费时返回None"""
+    lo = hi = None
+    for s in schools:
+        t = s.get("tuition") or 0
+        if t > 0:
+            if lo is None or t < lo:
+                lo = t
+            if hi is None or t > hi:
+                hi = t
+    return (lo, hi) if lo is not None else None
+
 @router.post("/parent")
 async def create_parent_evaluation(eval_data: ParentEvaluationCreate):
     """创建家长评估"""
@@ -21,8 +118,8 @@ async def create_parent_evaluation(eval_data: ParentEvaluationCreate):
         
         if db is None:
             # 如果全局数据库连接不可用，创建新的连接
-            from motor.motor_asyncio import AsyncIOMotorClient
-            client = AsyncIOMotorClient('mongodb://localhost:27017')
+            from pymongo import AsyncMongoClient
+            client = AsyncMongoClient('mongodb://localhost:27017')
             db = client.university_matcher
         
         print(f"开始处理评估请求，用户ID: {eval_data.user_id}")
@@ -31,6 +128,8 @@ async def create_parent_evaluation(eval_data: ParentEvaluationCreate):
         recommended_school_ids: list[str] = []
         # 分国家处理 - AU/UK/SG 将走各自逻辑文件；USA 维持旧逻辑
         country = eval_data.input.target_country
+        # 输入只序列化一次，供打分和生成解释复用
+        input_dict = eval_data.input.model_dump()
         print(f"🔍 DEBUG: country = '{country}', type = {type(country)}")
         fallback_info = None  # AU/UK/SG使用
         if country == "Australia":
@@ -42,7 +141,7 @@ async def create_parent_evaluation(eval_data: ParentEvaluationCreate):
             print(f"📊 找到 {len(au_docs)} 所澳洲大学")
             # 打分排序（新版本支持回退策略）
             try:
-                scored, fallback_info = apply_au_filters_and_score(eval_data.input.dict(), au_docs, enable_fallback=True)
+                scored, fallback_info = apply_au_filters_and_score(input_dict, au_docs, enable_fallback=True)
                 print(f"📊 评分后得到 {len(scored)} 所学校")
             except Exception as e:
                 print(f"⚠️ 评分过程出错: {e}")
@@ -63,67 +162,52 @@ async def create_parent_evaluation(eval_data: ParentEvaluationCreate):
                 else:
                     schools = []
             else:
-                school_obj_ids = [ObjectId(x) for x in recommended_school_ids]
-                schools = await db.university_au.find({"_id": {"$in": school_obj_ids}}).to_list(length=len(school_obj_ids))
+                school_obj_ids = list(map(ObjectId, recommended_school_ids))
+                schools = await db.university_au.find({"_id": {"$in": school_obj_ids}}).batch_size(len(school_obj_ids)).to_list(length=None)
         elif country == "United Kingdom":
             uk_docs = await db.university_uk.find({"country": "United Kingdom"}).to_list(length=None)
-            scored, fallback_info = apply_uk_filters_and_score(eval_data.input.dict(), uk_docs, enable_fallback=True)
+            scored, fallback_info = apply_uk_filters_and_score(input_dict, uk_docs, enable_fallback=True)
             top = scored[:5]
             recommended_school_ids = [s["id"] for s in top]
-            school_obj_ids = [ObjectId(x) for x in recommended_school_ids]
-            schools = await db.university_uk.find({"_id": {"$in": school_obj_ids}}).to_list(length=len(school_obj_ids))
+            school_obj_ids = list(map(ObjectId, recommended_school_ids))
+            schools = await db.university_uk.find({"_id": {"$in": school_obj_ids}}).batch_size(len(school_obj_ids)).to_list(length=None)
         elif country == "Singapore":
             print("✅ 进入Singapore分支 - 开始处理SG评估")
             sg_docs = await db.university_sg.find({"country": "Singapore"}).to_list(length=None)
             print(f"📊 找到 {len(sg_docs)} 所新加坡大学")
-            scored, fallback_info = apply_sg_filters_and_score(eval_data.input.dict(), sg_docs, enable_fallback=True)
+            scored, fallback_info = apply_sg_filters_and_score(input_dict, sg_docs, enable_fallback=True)
             print(f"📊 评分后得到 {len(scored)} 所学校，fallback_applied: {fallback_info.get('applied', False) if fallback_info else False}")
             top = scored[:5]
             recommended_school_ids = [s["id"] for s in top]
             print(f"📊 推荐学校IDs: {recommended_school_ids}")
-            school_obj_ids = [ObjectId(x) for x in recommended_school_ids]
-            schools = await db.university_sg.find({"_id": {"$in": school_obj_ids}}).to_list(length=len(school_obj_ids))
+            school_obj_ids = list(map(ObjectId, recommended_school_ids))
+            schools = await db.university_sg.find({"_id": {"$in": school_obj_ids}}).batch_size(len(school_obj_ids)).to_list(length=None)
             print(f"📊 从数据库获取到 {len(schools)} 所学校详情")
         else:
             # USA 或未指定 → 使用原有逻辑（US universities 集合）
             recommended_school_ids = await recommend_schools_for_parent(eval_data.input)
-            school_ids = [ObjectId(school_id) for school_id in recommended_school_ids]
-            schools = await db.universities.find({"_id": {"$in": school_ids}}).to_list(length=len(school_ids))
+            school_ids = list(map(ObjectId, recommended_school_ids))
+            schools = await db.universities.find({"_id": {"$in": school_ids}}).batch_size(len(school_ids)).to_list(length=None)
         
-        # 生成学生画像、申请策略和专业建议
-        try:
-            student_profile = generate_student_profile(eval_data.input)
-        except Exception as e:
-            print(f"⚠️ 生成学生画像时出错: {e}")
+        # 生成学生画像、申请策略和专业建议：画像/策略是同步计算，放到线程池执行，
+        # 与GPT总结并发进行，避免阻塞事件循环
+        loop = asyncio.get_running_loop()
+        student_profile, strategy_text, gpt_summary = await asyncio.gather(
+            loop.run_in_executor(None, generate_student_profile, eval_data.input),
+            loop.run_in_executor(None, generate_application_strategy, eval_data.input, len(recommended_school_ids)),
+            generate_parent_evaluation_summary(eval_data.input, recommended_school_ids),
+            return_exceptions=True
+        )
+        if isinstance(student_profile, Exception):
+            print(f"⚠️ 生成学生画像时出错: {student_profile}")
             student_profile = {"type": "", "description": ""}
-        
-        try:
-            strategy_text = generate_application_strategy(eval_data.input, len(recommended_school_ids))
-        except Exception as e:
-            print(f"⚠️ 生成申请策略时出错: {e}")
+        if isinstance(strategy_text, Exception):
+            print(f"⚠️ 生成申请策略时出错: {strategy_text}")
             strategy_text = ""
-        
-        try:
-            gpt_summary = await generate_parent_evaluation_summary(eval_data.input, recommended_school_ids)
-        except Exception as e:
-            print(f"⚠️ 生成GPT总结时出错: {e}")
+        if isinstance(gpt_summary, Exception):
+            print(f"⚠️ 生成GPT总结时出错: {gpt_summary}")
             gpt_summary = ""
         
-        # 创建评估记录
-        evaluation = ParentEvaluation(
-            user_id=eval_data.user_id,
-            input=eval_data.input,
-            recommended_schools=recommended_school_ids,
-            gpt_summary=gpt_summary,
-            fallback_info=fallback_info if country in ["Australia", "United Kingdom", "Singapore"] else None  # 保存回退信息（AU/UK/SG）
-        )
-        
-        # Convert to dict without the id field to avoid _id: null issue
-        evaluation_dict = evaluation.dict(by_alias=True, exclude={'id'})
-        result = await db.parent_evaluations.insert_one(evaluation_dict)
-        evaluation.id = result.inserted_id
-        print(f"评估记录已保存，ID: {evaluation.id}")
-        
         # 构建返回给前端的数据结构（按国家映射字段）
         recommended_schools = []
         if country == "Australia":
@@ -226,13 +310,40 @@ async def create_parent_evaluation(eval_data: ParentEvaluationCreate):
                     "supports_rd": school.get("supports_rd", False)
                 })
         
+        # USA：ED/EA/RD分类、画像与策略只依赖本次输入和推荐学校，创建时计算一次并随评估保存，
+        # GET时直接读取，无需重复计算
+        ed_suggestion, ea_suggestions, rd_suggestions = None, [], []
+        strategy = None
+        if country not in ["Australia", "United Kingdom", "Singapore"]:
+            ed_suggestion, ea_suggestions, rd_suggestions = classify_applications(recommended_schools)
+            strategy = {"plan": strategy_text, "count": len(recommended_schools)}
+        
+        # 创建评估记录
+        evaluation = ParentEvaluation(
+            user_id=eval_data.user_id,
+            input=eval_data.input,
+            recommended_schools=recommended_school_ids,
+            ed_suggestion=ed_suggestion["id"] if ed_suggestion else None,
+            ea_suggestions=[s["id"] for s in ea_suggestions],
+            rd_suggestions=[s["id"] for s in rd_suggestions],
+            student_profile=student_profile if strategy is not None else None,
+            strategy=strategy,
+            gpt_summary=gpt_summary,
+            fallback_info=fallback_info if country in ["Australia", "United Kingdom", "Singapore"] else None  # 保存回退信息（AU/UK/SG）
+        )
+        
+        # Convert to dict without the id field to avoid _id: null issue
+        evaluation_dict = evaluation.model_dump(by_alias=True, exclude={'id'})
+        result = await db.parent_evaluations.insert_one(evaluation_dict)
+        evaluation.id = result.inserted_id
+        print(f"评估记录已保存，ID: {evaluation.id}")
+        
         # 根据国家构建不同的返回结构
         print(f"🔍 构建返回结构 - 当前国家: {country}, 类型: {type(country)}")
         if country == "Australia":
             print("✅ 进入澳洲专用分支")
             # 澳洲专用结构：生成每所学校的详细解释
             from gpt.au_evaluation import generate_school_explanations
-            input_dict = eval_data.input.dict()
             
             # 创建ID到score的映射
             score_map = {s["id"]: s.get("score", 0) for s in top if "id" in s}
@@ -240,6 +351,14 @@ async def create_parent_evaluation(eval_data: ParentEvaluationCreate):
             # 限制推荐学校数量为最多5所
             recommended_schools_limited = recommended_schools[:5]
             
+            # 计算预算范围
+            tuition_range = _tuition_range(recommended_schools_limited)
+            if tuition_range:
+                lo, hi = tuition_range
+                budget_range = f"推荐学校学费范围：${lo:,} - ${hi:,}/年（USD）"
+            else:
+                budget_range = "推荐学校学费范围：请查看具体学校信息"
+            
             schools_with_explanations = []
             for school in recommended_schools_limited:
                 school_id = school["id"]
@@ -275,35 +394,14 @@ async def create_parent_evaluation(eval_data: ParentEvaluationCreate):
                 "targetCountry": "Australia",
                 "recommendedSchools": schools_with_explanations,  # 已经是前5所了
                 "fallbackInfo": fallback_info if fallback_info else {"applied": False, "steps": []},
-                "applicationGuidance": {
-                    "title": "澳洲大学申请流程说明",
-                    "steps": [
-                        "1. 准备材料：高中成绩单、英语成绩（IELTS/TOEFL/PTE）、个人陈述（部分学校需要）",
-                        "2. 选择入学时间：多数学校提供2月和7月入学，部分提供3个学期",
-                        "3. 直接申请：通过学校官网或授权代理申请（无需统一系统）",
-                        "4. 语言班选项：如英语未达标，可申请语言/过渡课程，通过后进入正课",
-                        "5. 接受Offer：收到录取后按要求缴纳押金并办理学生签证",
-                        "6. 签证申请：准备资金证明、体检等材料，申请澳洲学生签证"
-                    ],
-                    "keyPoints": [
-                        "申请时间灵活：通常提前3-6个月即可，部分热门专业需更早",
-                        "英语成绩：大部分学校接受多种英语考试，可后补（部分专业除外）",
-                        "申请费：多数学校申请免费或费用较低（约50-100澳元）"
-                    ]
-                },
-                "keyInfoSummary": {
-                    "budgetRange": f"推荐学校学费范围：${min([s.get('tuition', 0) for s in recommended_schools_limited] + [0]):,} - ${max([s.get('tuition', 0) for s in recommended_schools_limited] + [0]):,}/年（USD）" if recommended_schools_limited else "推荐学校学费范围：请查看具体学校信息",
-                    "englishRequirement": "大部分学校要求IELTS 6.5（单项不低于6.0）或同等水平",
-                    "intakeTiming": "主要入学时间：2月和7月",
-                    "pswInfo": "毕业后可获得2-4年PSW工作签证（取决于学习时长和地区）"
-                },
+                "applicationGuidance": _AU_APPLICATION_GUIDANCE,
+                "keyInfoSummary": {"budgetRange": budget_range, **_AU_KEY_INFO},
                 "gptSummary": gpt_summary,
                 "created_at": evaluation.created_at
             }
         elif country == "United Kingdom":
             # 英国专用结构：生成每所学校的详细解释
             from gpt.uk_evaluation import generate_school_explanations
-            input_dict = eval_data.input.dict()
             
             # 创建ID到score的映射
             score_map = {s["id"]: s.get("score", 0) for s in top if "id" in s}
@@ -338,10 +436,10 @@ async def create_parent_evaluation(eval_data: ParentEvaluationCreate):
                     })
             
             # 计算预算范围
-            tuition_values = [s.get("tuition", 0) for s in recommended_schools if s.get("tuition", 0) > 0]
-            budget_range = ""
-            if tuition_values:
-                budget_range = f"推荐学校学费范围：£{min(tuition_values):,} - £{max(tuition_values):,}/年（USD约${int(min(tuition_values) * 1.27):,} - ${int(max(tuition_values) * 1.27):,}）"
+            tuition_range = _tuition_range(recommended_schools)
+            if tuition_range:
+                lo, hi = tuition_range
+                budget_range = f"推荐学校学费范围：£{lo:,} - £{hi:,}/年（USD约${int(lo * 1.27):,} - ${int(hi * 1.27):,}）"
             else:
                 budget_range = "推荐学校学费范围：请查看具体学校信息"
             
@@ -351,31 +449,8 @@ async def create_parent_evaluation(eval_data: ParentEvaluationCreate):
                 "targetCountry": "United Kingdom",
                 "recommendedSchools": schools_with_explanations,
                 "fallbackInfo": fallback_info if fallback_info else {"applied": False, "steps": []},
-                "applicationGuidance": {
-                    "title": "英国大学申请流程说明",
-                    "steps": [
-                        "1. 准备材料：A-Level/IB成绩、个人陈述（PS）、推荐信、入学测试（如Oxbridge/医学类）",
-                        "2. UCAS申请：通过UCAS统一系统提交申请（最多5个志愿）",
-                        "3. 申请时间：Oxbridge/医学类10月15日截止，常规路线1月31日截止",
-                        "4. Foundation路线：如成绩不足，可先读预科或国际大一，再衔接本科",
-                        "5. 等待Offer：收到条件录取或无条件录取",
-                        "6. 选择确认：在UCAS上确认最终选择并满足条件",
-                        "7. 签证申请：收到CAS后申请英国学生签证"
-                    ],
-                    "keyPoints": [
-                        "UCAS系统：所有英国本科申请必须通过UCAS提交",
-                        "申请费：单次申请费约£22.50（1个志愿）或£27（2-5个志愿）",
-                        "Personal Statement：所有志愿共用一份，需精心准备",
-                        "入学测试：Oxbridge、医学、部分专业需要额外测试（如STEP、BMAT等）",
-                        "Foundation：成绩或科目不足时可考虑预科/国际大一，无需UCAS"
-                    ]
-                },
-                "keyInfoSummary": {
-                    "budgetRange": f"推荐学校学费范围：£{min([s.get('tuition', 0) for s in recommended_schools_limited] + [0]):,} - £{max([s.get('tuition', 0) for s in recommended_schools_limited] + [0]):,}/年（USD约${int(min([s.get('tuition', 0) for s in recommended_schools_limited] + [0]) * 1.27):,} - ${int(max([s.get('tuition', 0) for s in recommended_schools_limited] + [0]) * 1.27):,}）" if recommended_schools_limited else "推荐学校学费范围：请查看具体学校信息",
-                    "ucasInfo": "主要申请时间：Oxbridge/医学类10月15日，常规路线1月31日",
-                    "foundationInfo": "如成绩不足，可考虑Foundation/国际大一路线",
-                    "visaInfo": "毕业后可申请PSW工作签证（本科/硕士2年，博士3年）"
-                },
+                "applicationGuidance": _UK_APPLICATION_GUIDANCE,
+                "keyInfoSummary": {"budgetRange": budget_range, **_UK_KEY_INFO},
                 "gptSummary": gpt_summary,
                 "created_at": evaluation.created_at
             }
@@ -383,7 +458,6 @@ async def create_parent_evaluation(eval_data: ParentEvaluationCreate):
             print("✅ 进入新加坡专用返回结构分支")
             # 新加坡专用结构：生成每所学校的详细解释
             from gpt.sg_evaluation import generate_school_explanations
-            input_dict = eval_data.input.dict()
             
             # 创建ID到score的映射
             score_map = {s["id"]: s.get("score", 0) for s in top if "id" in s}
@@ -418,10 +492,10 @@ async def create_parent_evaluation(eval_data: ParentEvaluationCreate):
                     })
             
             # 计算预算范围
-            tuition_values = [s.get("tuition", 0) for s in recommended_schools_limited if s.get("tuition", 0) > 0]
-            budget_range = ""
-            if tuition_values:
-                budget_range = f"推荐学校学费范围：S${min(tuition_values):,} - S${max(tuition_values):,}/年（USD约${int(min(tuition_values) * 0.74):,} - ${int(max(tuition_values) * 0.74):,}）"
+            tuition_range = _tuition_range(recommended_schools_limited)
+            if tuition_range:
+                lo, hi = tuition_range
+                budget_range = f"推荐学校学费范围：S${lo:,} - S${hi:,}/年（USD约${int(lo * 0.74):,} - ${int(hi * 0.74):,}）"
             else:
                 budget_range = "推荐学校学费范围：请查看具体学校信息"
             
@@ -431,41 +505,13 @@ async def create_parent_evaluation(eval_data: ParentEvaluationCreate):
                 "targetCountry": "Singapore",
                 "recommendedSchools": schools_with_explanations,  # 已经是前5所了
                 "fallbackInfo": fallback_info if fallback_info else {"applied": False, "steps": []},
-                "applicationGuidance": {
-                    "title": "新加坡大学申请流程说明",
-                    "steps": [
-                        "1. 准备材料：高中成绩单、英语成绩（IELTS/TOEFL/PTE）、个人陈述、推荐信",
-                        "2. 提交申请：通过各大学官网直接申请（无需统一系统）",
-                        "3. 申请时间：多数大学10-11月开始接受申请，次年1-3月截止",
-                        "4. 面试/作品集：部分专业需要面试、作品集或小论文（需提前准备）",
-                        "5. Tuition Grant（TG）：如申请TG，需签约毕业后在新加坡工作若干年",
-                        "6. 等待Offer：收到录取通知（有条件/无条件）",
-                        "7. 接受Offer：按要求缴纳押金确认录取",
-                        "8. 学生签证：申请新加坡学生准证（Student Pass）"
-                    ],
-                    "keyPoints": [
-                        "申请系统：各大学独立申请系统，需分别提交材料",
-                        "申请费：多数大学申请费约S$10-50（约USD 7-37）",
-                        "TG申请：可在接受Offer后申请Tuition Grant，降低学费但需履行Bond服务期",
-                        "面试要求：部分热门专业（如医学、法律、设计）需要面试或作品集",
-                        "双学位：部分大学提供双学位项目，需额外申请或满足条件"
-                    ]
-                },
-                "keyInfoSummary": {
-                    "budgetRange": budget_range,
-                    "tgInfo": "Tuition Grant可大幅降低学费，但需签约在新加坡工作若干年",
-                    "applicationTiming": "主要申请时间：10-11月开始，次年1-3月截止",
-                    "visaInfo": "学生准证有效期通常覆盖整个学习期间，毕业后可申请工作准证"
-                },
+                "applicationGuidance": _SG_APPLICATION_GUIDANCE,
+                "keyInfoSummary": {"budgetRange": budget_range, **_SG_KEY_INFO},
                 "gptSummary": gpt_summary,
                 "created_at": evaluation.created_at
             }
         else:
-            # 其他国家（USA）使用原有结构
-            ed_suggestion, ea_suggestions, rd_suggestions = classify_applications(recommended_schools)
-            # 使用生成的学生画像和申请策略
-            strategy = {"plan": strategy_text, "count": len(recommended_schools)}
-            
+            # 其他国家（USA）使用原有结构（分类、画像与策略已在保存评估前计算）
             response_data = {
                 "id": str(evaluation.id),
                 "user_id": str(evaluation.user_id),
@@ -491,14 +537,23 @@ async def create_parent_evaluation(eval_data: ParentEvaluationCreate):
 @router.get("/parent/{eval_id}", response_model=dict)
 async def get_parent_evaluation(eval_id: str):
     """获取家长评估结果（即使无推荐也返回正常结构）"""
+    cached = _eval_response_cache.get(eval_id)
+    if cached is not None:
+        return cached
+    
+    response = await _build_parent_evaluation_response(eval_id)
+    _eval_response_cache.set(eval_id, response)
+    return response
+
+async def _build_parent_evaluation_response(eval_id: str):
+    """查询评估记录及推荐学校，构建返回给前端的数据结构"""
     try:
         db = get_db()
 
         # 参数校验
-        try:
-            eval_obj_id = ObjectId(eval_id)
-        except Exception:
+        if not ObjectId.is_valid(eval_id):
             raise HTTPException(status_code=400, detail="无效的评估ID")
+        eval_obj_id = ObjectId(eval_id)
 
         # 查询评估记录
         evaluation = await db.parent_evaluations.find_one({"_id": eval_obj_id})
@@ -506,19 +561,19 @@ async def get_parent_evaluation(eval_id: str):
             raise HTTPException(status_code=404, detail="评估不存在")
 
         input_country = evaluation.get("input", {}).get("target_country", "USA")
-        school_ids = [ObjectId(sid) for sid in evaluation.get("recommended_schools", [])]
+        school_ids = list(map(ObjectId, evaluation.get("recommended_schools", [])))
 
-        # 查询学校详情（按国家集合）
+        # 查询学校详情（按国家集合）；batch_size设为ID数量，一次往返取回全部学校
         schools = []
         if school_ids:
             if input_country == "Australia":
-                schools = await db.university_au.find({"_id": {"$in": school_ids}}).to_list(length=len(school_ids))
+                schools = await db.university_au.find({"_id": {"$in": school_ids}}).batch_size(len(school_ids)).to_list(length=None)
             elif input_country == "United Kingdom":
-                schools = await db.university_uk.find({"_id": {"$in": school_ids}}).to_list(length=len(school_ids))
+                schools = await db.university_uk.find({"_id": {"$in": school_ids}}).batch_size(len(school_ids)).to_list(length=None)
             elif input_country == "Singapore":
-                schools = await db.university_sg.find({"_id": {"$in": school_ids}}).to_list(length=len(school_ids))
+                schools = await db.university_sg.find({"_id": {"$in": school_ids}}).batch_size(len(school_ids)).to_list(length=None)
             else:
-                schools = await db.universities.find({"_id": {"$in": school_ids}}).to_list(length=len(school_ids))
+                schools = await db.universities.find({"_id": {"$in": school_ids}}).batch_size(len(school_ids)).to_list(length=None)
     
         # 兜底逻辑：如果查询结果为空（无论是school_ids为空还是查询无结果），对于AU至少返回排名前5的学校
         if not schools and input_country == "Australia":
@@ -684,10 +739,10 @@ async def get_parent_evaluation(eval_id: str):
             if not isinstance(fallback_info, dict):
                 fallback_info = {"applied": False, "steps": []}
             
-            tuition_values = [s.get("tuition", 0) for s in recommended_schools if s.get("tuition", 0) > 0]
-            budget_range = ""
-            if tuition_values:
-                budget_range = f"推荐学校学费范围：£{min(tuition_values):,} - £{max(tuition_values):,}/年（USD约${int(min(tuition_values) * 1.27):,} - ${int(max(tuition_values) * 1.27):,}）"
+            tuition_range = _tuition_range(recommended_schools)
+            if tuition_range:
+                lo, hi = tuition_range
+                budget_range = f"推荐学校学费范围：£{lo:,} - £{hi:,}/年（USD约${int(lo * 1.27):,} - ${int(hi * 1.27):,}）"
             else:
                 budget_range = "推荐学校学费范围：请查看具体学校信息"
             
@@ -697,31 +752,8 @@ async def get_parent_evaluation(eval_id: str):
                 "targetCountry": "United Kingdom",
                 "recommendedSchools": schools_with_explanations[:5],  # 限制最多5所
                 "fallbackInfo": fallback_info,
-                "applicationGuidance": {
-                    "title": "英国大学申请流程说明",
-                    "steps": [
-                        "1. 准备材料：A-Level/IB成绩、个人陈述（PS）、推荐信、入学测试（如Oxbridge/医学类）",
-                        "2. UCAS申请：通过UCAS统一系统提交申请（最多5个志愿）",
-                        "3. 申请时间：Oxbridge/医学类10月15日截止，常规路线1月31日截止",
-                        "4. Foundation路线：如成绩不足，可先读预科或国际大一，再衔接本科",
-                        "5. 等待Offer：收到条件录取或无条件录取",
-                        "6. 选择确认：在UCAS上确认最终选择并满足条件",
-                        "7. 签证申请：收到CAS后申请英国学生签证"
-                    ],
-                    "keyPoints": [
-                        "UCAS系统：所有英国本科申请必须通过UCAS提交",
-                        "申请费：单次申请费约£22.50（1个志愿）或£27（2-5个志愿）",
-                        "Personal Statement：所有志愿共用一份，需精心准备",
-                        "入学测试：Oxbridge、医学、部分专业需要额外测试（如STEP、BMAT等）",
-                        "Foundation：成绩或科目不足时可考虑预科/国际大一，无需UCAS"
-                    ]
-                },
-                "keyInfoSummary": {
-                    "budgetRange": budget_range,
-                    "ucasInfo": "主要申请时间：Oxbridge/医学类10月15日，常规路线1月31日",
-                    "foundationInfo": "如成绩不足，可考虑Foundation/国际大一路线",
-                    "visaInfo": "毕业后可申请PSW工作签证（本科/硕士2年，博士3年）"
-                },
+                "applicationGuidance": _UK_APPLICATION_GUIDANCE,
+                "keyInfoSummary": {"budgetRange": budget_range, **_UK_KEY_INFO},
                 "gptSummary": evaluation.get("gpt_summary", ""),  # 添加gptSummary字段
                 "created_at": evaluation.get("created_at")
             }
@@ -779,10 +811,10 @@ async def get_parent_evaluation(eval_id: str):
             if not isinstance(fallback_info, dict):
                 fallback_info = {"applied": False, "steps": []}
             
-            tuition_values = [s.get("tuition", 0) for s in recommended_schools if s.get("tuition", 0) > 0]
-            budget_range = ""
-            if tuition_values:
-                budget_range = f"推荐学校学费范围：S${min(tuition_values):,} - S${max(tuition_values):,}/年（USD约${int(min(tuition_values) * 0.74):,} - ${int(max(tuition_values) * 0.74):,}）"
+            tuition_range = _tuition_range(recommended_schools)
+            if tuition_range:
+                lo, hi = tuition_range
+                budget_range = f"推荐学校学费范围：S${lo:,} - S${hi:,}/年（USD约${int(lo * 0.74):,} - ${int(hi * 0.74):,}）"
             else:
                 budget_range = "推荐学校学费范围：请查看具体学校信息"
             
@@ -792,32 +824,8 @@ async def get_parent_evaluation(eval_id: str):
                 "targetCountry": "Singapore",
                 "recommendedSchools": schools_with_explanations[:5],  # 限制最多5所
                 "fallbackInfo": fallback_info,
-                "applicationGuidance": {
-                    "title": "新加坡大学申请流程说明",
-                    "steps": [
-                        "1. 准备材料：高中成绩单、英语成绩（IELTS/TOEFL/PTE）、个人陈述、推荐信",
-                        "2. 提交申请：通过各大学官网直接申请（无需统一系统）",
-                        "3. 申请时间：多数大学10-11月开始接受申请，次年1-3月截止",
-                        "4. 面试/作品集：部分专业需要面试、作品集或小论文（需提前准备）",
-                        "5. Tuition Grant（TG）：如申请TG，需签约毕业后在新加坡工作若干年",
-                        "6. 等待Offer：收到录取通知（有条件/无条件）",
-                        "7. 接受Offer：按要求缴纳押金确认录取",
-                        "8. 学生签证：申请新加坡学生准证（Student Pass）"
-                    ],
-                    "keyPoints": [
-                        "申请系统：各大学独立申请系统，需分别提交材料",
-                        "申请费：多数大学申请费约S$10-50（约USD 7-37）",
-                        "TG申请：可在接受Offer后申请Tuition Grant，降低学费但需履行Bond服务期",
-                        "面试要求：部分热门专业（如医学、法律、设计）需要面试或作品集",
-                        "双学位：部分大学提供双学位项目，需额外申请或满足条件"
-                    ]
-                },
-                "keyInfoSummary": {
-                    "budgetRange": budget_range,
-                    "tgInfo": "Tuition Grant可大幅降低学费，但需签约在新加坡工作若干年",
-                    "applicationTiming": "主要申请时间：10-11月开始，次年1-3月截止",
-                    "visaInfo": "学生准证有效期通常覆盖整个学习期间，毕业后可申请工作准证"
-                },
+                "applicationGuidance": _SG_APPLICATION_GUIDANCE,
+                "keyInfoSummary": {"budgetRange": budget_range, **_SG_KEY_INFO},
                 "gptSummary": evaluation.get("gpt_summary", ""),  # 添加gptSummary字段
                 "created_at": evaluation.get("created_at")
             }
@@ -869,10 +877,10 @@ async def get_parent_evaluation(eval_id: str):
                 fallback_info = {"applied": False, "steps": []}
             
             # 计算关键信息汇总
-            tuition_values = [s.get("tuition", 0) for s in recommended_schools if s.get("tuition", 0) > 0]
-            budget_range = ""
-            if tuition_values:
-                budget_range = f"推荐学校学费范围：${min(tuition_values):,} - ${max(tuition_values):,}/年（USD）"
+            tuition_range = _tuition_range(recommended_schools)
+            if tuition_range:
+                lo, hi = tuition_range
+                budget_range = f"推荐学校学费范围：${lo:,} - ${hi:,}/年（USD）"
             else:
                 budget_range = "推荐学校学费范围：请查看具体学校信息"
             
@@ -882,54 +890,53 @@ async def get_parent_evaluation(eval_id: str):
                 "targetCountry": "Australia",
                 "recommendedSchools": schools_with_explanations[:5],  # 限制最多5所
                 "fallbackInfo": fallback_info,
-                "applicationGuidance": {
-                    "title": "澳洲大学申请流程说明",
-                    "steps": [
-                        "1. 准备材料：高中成绩单、英语成绩（IELTS/TOEFL/PTE）、个人陈述（部分学校需要）",
-                        "2. 选择入学时间：多数学校提供2月和7月入学，部分提供3个学期",
-                        "3. 直接申请：通过学校官网或授权代理申请（无需统一系统）",
-                        "4. 语言班选项：如英语未达标，可申请语言/过渡课程，通过后进入正课",
-                        "5. 接受Offer：收到录取后按要求缴纳押金并办理学生签证",
-                        "6. 签证申请：准备资金证明、体检等材料，申请澳洲学生签证"
-                    ],
-                    "keyPoints": [
-                        "申请时间灵活：通常提前3-6个月即可，部分热门专业需更早",
-                        "英语成绩：大部分学校接受多种英语考试，可后补（部分专业除外）",
-                        "申请费：多数学校申请免费或费用较低（约50-100澳元）"
-                    ]
-                },
-                "keyInfoSummary": {
-                    "budgetRange": budget_range,
-                    "englishRequirement": "大部分学校要求IELTS 6.5（单项不低于6.0）或同等水平",
-                    "intakeTiming": "主要入学时间：2月和7月",
-                    "pswInfo": "毕业后可获得2-4年PSW工作签证（取决于学习时长和地区）"
-                },
+                "applicationGuidance": _AU_APPLICATION_GUIDANCE,
+                "keyInfoSummary": {"budgetRange": budget_range, **_AU_KEY_INFO},
                 "gptSummary": evaluation.get("gpt_summary", ""),  # 添加gptSummary字段
                 "created_at": evaluation.get("created_at")
             }
         else:
-            # 其他国家（USA）返回原有结构，需要分类ED/EA/RD
-            from gpt.recommend_schools import classify_applications, generate_student_profile, generate_application_strategy
-            from models.evaluation import ParentEvaluationInput
-            
-            ed_suggestion, ea_suggestions, rd_suggestions = classify_applications(recommended_schools)
-            
-            # 从数据库读取的input数据重新生成学生画像和申请策略
-            input_dict = evaluation.get("input") or {}
-            if not isinstance(input_dict, dict):
-                input_dict = {}
-            
-            try:
-                # 将字典转换为ParentEvaluationInput对象
-                input_data = ParentEvaluationInput(**input_dict)
-                student_profile = generate_student_profile(input_data)
-                strategy_text = generate_application_strategy(input_data, len(recommended_schools))
-            except Exception as e:
-                print(f"⚠️ 生成学生画像或申请策略时出错: {e}")
-                student_profile = {"type": "", "description": ""}
-                strategy_text = ""
-            
-            strategy = {"plan": strategy_text, "count": len(recommended_schools)}
+            # 其他国家（USA）返回原有结构：ED/EA/RD分类、画像与策略在创建时已保存，直接读取
+            student_profile = evaluation.get("student_profile")
+            strategy = evaluation.get("strategy")
+            if student_profile is not None and strategy is not None:
+                schools_by_id = {s["id"]: s for s in recommended_schools}
+                ed_id = evaluation.get("ed_suggestion")
+                ed_suggestion = schools_by_id.get(ed_id) if ed_id else None
+                ea_suggestions = [schools_by_id[sid] for sid in evaluation.get("ea_suggestions", []) if sid in schools_by_id]
+                rd_suggestions = [schools_by_id[sid] for sid in evaluation.get("rd_suggestions", []) if sid in schools_by_id]
+            else:
+                # 旧记录没有保存这些字段：重新计算一次并回写，后续读取不再重复计算
+                from models.evaluation import ParentEvaluationInput
+                
+                ed_suggestion, ea_suggestions, rd_suggestions = classify_applications(recommended_schools)
+                
+                input_dict = evaluation.get("input") or {}
+                if not isinstance(input_dict, dict):
+                    input_dict = {}
+                
+                try:
+                    # 将字典转换为ParentEvaluationInput对象
+                    input_data = ParentEvaluationInput(**input_dict)
+                    student_profile = generate_student_profile(input_data)
+                    strategy_text = generate_application_strategy(input_data, len(recommended_schools))
+                except Exception as e:
+                    print(f"⚠️ 生成学生画像或申请策略时出错: {e}")
+                    student_profile = {"type": "", "description": ""}
+                    strategy_text = ""
+                
+                strategy = {"plan": strategy_text, "count": len(recommended_schools)}
+                
+                await db.parent_evaluations.update_one(
+                    {"_id": eval_obj_id},
+                    {"$set": {
+                        "ed_suggestion": ed_suggestion["id"] if ed_suggestion else None,
+                        "ea_suggestions": [s["id"] for s in ea_suggestions],
+                        "rd_suggestions": [s["id"] for s in rd_suggestions],
+                        "student_profile": student_profile,
+                        "strategy": strategy,
+                    }}
+                )
             
             return {
                 "id": str(evaluation.get("_id")),
@@ -950,14 +957,30 @@ async def get_parent_evaluation(eval_id: str):
         raise HTTPException(status_code=500, detail=f"获取评估结果时出错: {str(e)}")
 
 @router.get("/parent/user/{user_id}", response_model=List[ParentEvaluationResponse])
-async def get_parent_evaluations_by_user(user_id: str):
-    """根据用户ID获取家长评估结果列表"""
+async def get_parent_evaluations_by_user(
+    user_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200, description="每页返回的评估数量（按时间倒序）"),
+    cursor: Optional[str] = Query(None, description="上一页响应头X-Next-Cursor的值；提供时从该位置继续取更早的评估")
+):
+    """根据用户ID获取家长评估结果列表（按时间倒序分页，还有更早的评估时通过X-Next-Cursor响应头返回游标）"""
     db = get_db()
     
-    evaluations = await db.parent_evaluations.find({"user_id": user_id}).sort("created_at", -1).to_list(length=None)
+    filter_conditions = {"user_id": user_id}
+    if cursor:
+        filter_conditions.update(decode_created_cursor(cursor))
     
-    return [
-        ParentEvaluationResponse(
+    # 按页大小限定数量并设置批次，避免一次性把用户全部历史评估加载进内存；多取一条用于判断是否还有下一页
+    docs = await db.parent_evaluations.find(filter_conditions).sort(CREATED_DESC_SORT).limit(limit + 1).batch_size(limit + 1).to_list(length=limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_created_cursor(docs[-1])
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    
+    evaluations = []
+    for eval in docs:
+        evaluations.append(ParentEvaluationResponse(
             id=str(eval["_id"]),
             user_id=str(eval["user_id"]),
             input=eval["input"],
@@ -967,9 +990,8 @@ async def get_parent_evaluations_by_user(user_id: str):
             rd_suggestions=[str(school_id) for school_id in eval.get("rd_suggestions", [])],
             gpt_summary=eval["gpt_summary"],
             created_at=eval["created_at"]
-        )
-        for eval in evaluations
-    ]
+        ))
+    return evaluations
 
 @router.post("/student", response_model=StudentTestResponse)
 async def create_student_test(test_data: StudentTestCreate):
@@ -986,7 +1008,7 @@ async def create_student_test(test_data: StudentTestCreate):
     )
     
     # Convert to dict without the id field to avoid _id: null issue
-    test_dict = test.dict(by_alias=True, exclude={'id'})
+    test_dict = test.model_dump(by_alias=True, exclude={'id'})
     result = await db.student_personality_tests.insert_one(test_dict)
     test.id = result.inserted_id
     
@@ -1005,10 +1027,9 @@ async def get_student_test(test_id: str):
     """获取学生人格测评结果"""
     db = get_db()
     
-    try:
-        test_obj_id = ObjectId(test_id)
-    except:
+    if not ObjectId.is_valid(test_id):
         raise HTTPException(status_code=400, detail="无效的测评ID")
+    test_obj_id = ObjectId(test_id)
     
     test = await db.student_personality_tests.find_one({"_id": test_obj_id})
     if not test:
@@ -1,116 +1,232 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+import asyncio
+import hashlib
+import json
+import re
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import List, Literal, Optional
 from bson import ObjectId
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 from models.university import University, UniversityResponse
 from db.mongo import get_db
+from utils.cache import TTLCache
+from utils.parsing import parse_list_or_csv
+from utils.pagination import RANK_SORT, apply_rank_cursor, decode_rank_cursor, encode_rank_cursor
 
 router = APIRouter()
-def _parse_list_or_csv(value):
-    if isinstance(value, list):
-        return value
-    if isinstance(value, str):
-        return [s.strip() for s in value.split(',') if s.strip()]
-    return []
 
-@router.get("/international/au")
-async def list_international_au(page: int = 1, page_size: int = 50):
-    db = get_db()
-    cursor = db.university_au.find({}).skip((page-1)*page_size).limit(page_size).sort("rank", 1)
-    docs = await cursor.to_list(length=page_size)
-    for d in docs:
-        d["_id"] = str(d["_id"])  # stringify id
-        d["strengths"] = _parse_list_or_csv(d.get("strengths", []))
-        d["tags"] = _parse_list_or_csv(d.get("tags", []))
-    return docs
+# 列表接口只序列化以下字段，查询时使用投影减少传输量与BSON解码开销
+_UNIVERSITY_LIST_PROJECTION = {
+    "name": 1, "country": 1, "state": 1, "rank": 1, "tuition": 1, "intlRate": 1,
+    "type": 1, "strengths": 1, "gptSummary": 1, "logoUrl": 1,
+}
+_UNIVERSITY_DETAIL_PROJECTION = {
+    **_UNIVERSITY_LIST_PROJECTION,
+    "location": 1, "personality_types": 1, "schoolSize": 1, "description": 1,
+    "supports_ed": 1, "supports_ea": 1, "supports_rd": 1, "internship_support_score": 1,
+    "acceptanceRate": 1, "satRange": 1, "actRange": 1, "gpaRange": 1, "applicationDeadline": 1,
+    "website": 1, "has_internship_program": 1, "has_research_program": 1, "tags": 1,
+}
+_INTERNATIONAL_LIST_PROJECTION = {
+    "name": 1, "country": 1, "city": 1, "rank": 1, "tuition_usd": 1, "tuition_local": 1,
+    "intlRate": 1, "currency": 1, "strengths": 1, "website": 1,
+}
 
-@router.get("/international/au/{id}")
-async def get_international_au(id: str):
-    from bson import ObjectId
-    db = get_db()
-    doc = await db.university_au.find_one({"_id": ObjectId(id)})
-    if not doc:
-        raise HTTPException(status_code=404, detail="未找到大学")
-    doc["_id"] = str(doc["_id"])  # stringify id
-    doc["strengths"] = _parse_list_or_csv(doc.get("strengths", []))
-    doc["tags"] = _parse_list_or_csv(doc.get("tags", []))
-    return doc
+# 国家/专业列表变化频率以天计，缓存10分钟避免每次请求都执行distinct/全表扫描
+_LIST_CACHE_TTL = 600
+_countries_cache = TTLCache(_LIST_CACHE_TTL)
+# 专业列表按country查询参数缓存，参数可任意取值，限制条目数防止内存无限增长
+_strengths_cache = TTLCache(_LIST_CACHE_TTL, maxsize=256)
 
-@router.get("/international/uk")
-async def list_international_uk(page: int = 1, page_size: int = 50):
-    db = get_db()
-    cursor = db.university_uk.find({}).skip((page-1)*page_size).limit(page_size).sort("rank", 1)
-    docs = await cursor.to_list(length=page_size)
+# 同一筛选条件的总数在短时间内基本不变，缓存60秒，命中时分页查询只取当前页
+_COUNT_CACHE_TTL = 60
+_count_cache = TTLCache(_COUNT_CACHE_TTL, maxsize=1024)
+
+# 列表查询的服务端执行上限：索引命中时远低于此值，超时说明走了异常计划，尽早失败而不是长时间占用连接
+_QUERY_MAX_TIME_MS = 500
+
+# 列表响应的HTTP缓存：浏览器/CDN在max-age内直接复用；之后带If-None-Match重新验证。
+# ETag取自序列化后的响应体，只有内容相同才返回304；查询失败时的降级空结果不带缓存头
+_HTTP_CACHE_MAX_AGE = 30
+_RAW_LIST_ADAPTER = TypeAdapter(List[dict])
+_UNIVERSITY_LIST_ADAPTER = TypeAdapter(List[UniversityResponse])
+
+def _cacheable_json(request: Request, response: Response, adapter: TypeAdapter, content) -> Response:
+    """把查询成功的结果序列化为JSON响应并设置ETag/Cache-Control；
+    If-None-Match与当前响应体的ETag一致时返回304。保留已写入的X-Next-Cursor响应头"""
+    body = adapter.dump_json(content)
+    etag = 'W/"' + hashlib.md5(body).hexdigest()[:16] + '"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={_HTTP_CACHE_MAX_AGE}"}
+    next_cursor = response.headers.get("X-Next-Cursor")
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def _list_international_docs(collection, response: Response, page: int, page_size: int, cursor: Optional[str]):
+    """AU/UK/SG原始文档列表：提供cursor时按(rank, _id)游标翻页，否则兼容page分页；
+    还有下一页时通过X-Next-Cursor响应头返回游标"""
+    if cursor:
+        uni_cursor = collection.find(decode_rank_cursor(cursor))
+    else:
+        uni_cursor = collection.find({}).skip((page - 1) * page_size)
+    # 多取一条用于判断是否还有下一页
+    docs = await uni_cursor.sort(RANK_SORT).limit(page_size + 1).batch_size(page_size + 1).max_time_ms(_QUERY_MAX_TIME_MS).to_list(length=page_size + 1)
+    if len(docs) > page_size:
+        docs = docs[:page_size]
+        response.headers["X-Next-Cursor"] = encode_rank_cursor(docs[-1])
     for d in docs:
         d["_id"] = str(d["_id"])  # stringify id
-        d["strengths"] = _parse_list_or_csv(d.get("strengths", []))
-        d["tags"] = _parse_list_or_csv(d.get("tags", []))
+        d["strengths"] = parse_list_or_csv(d.get("strengths", []))
+        d["tags"] = parse_list_or_csv(d.get("tags", []))
     return docs
 
-@router.get("/international/uk/{id}")
-async def get_international_uk(id: str):
-    from bson import ObjectId
-    db = get_db()
-    doc = await db.university_uk.find_one({"_id": ObjectId(id)})
-    if not doc:
-        raise HTTPException(status_code=404, detail="未找到大学")
-    doc["_id"] = str(doc["_id"])  # stringify id
-    doc["strengths"] = _parse_list_or_csv(doc.get("strengths", []))
-    doc["tags"] = _parse_list_or_csv(doc.get("tags", []))
-    return doc
+# 路径中的国家代码 -> 集合名
+_INTL_COLL_BY_CODE = {"au": "university_au", "uk": "university_uk", "sg": "university_sg"}
 
-@router.get("/international/sg")
-async def list_international_sg(page: int = 1, page_size: int = 50):
+@router.get("/international/{country_code}")
+async def list_international(
+    request: Request,
+    response: Response,
+    country_code: Literal["au", "uk", "sg"],
+    page: int = 1,
+    page_size: int = 50,
+    cursor: Optional[str] = None,
+):
+    """AU/UK/SG大学原始文档列表"""
     db = get_db()
-    cursor = db.university_sg.find({}).skip((page-1)*page_size).limit(page_size).sort("rank", 1)
-    docs = await cursor.to_list(length=page_size)
-    for d in docs:
-        d["_id"] = str(d["_id"])  # stringify id
-        d["strengths"] = _parse_list_or_csv(d.get("strengths", []))
-        d["tags"] = _parse_list_or_csv(d.get("tags", []))
-    return docs
+    collection = getattr(db, _INTL_COLL_BY_CODE[country_code])
+    docs = await _list_international_docs(collection, response, page, page_size, cursor)
+    return _cacheable_json(request, response, _RAW_LIST_ADAPTER, docs)
 
-@router.get("/international/sg/{id}")
-async def get_international_sg(id: str):
-    from bson import ObjectId
+@router.get("/international/{country_code}/{id}")
+async def get_international(country_code: Literal["au", "uk", "sg"], id: str):
+    """AU/UK/SG大学原始文档详情"""
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=400, detail="无效的大学ID")
     db = get_db()
-    doc = await db.university_sg.find_one({"_id": ObjectId(id)})
+    doc = await getattr(db, _INTL_COLL_BY_CODE[country_code]).find_one({"_id": ObjectId(id)})
     if not doc:
         raise HTTPException(status_code=404, detail="未找到大学")
     doc["_id"] = str(doc["_id"])  # stringify id
-    doc["strengths"] = _parse_list_or_csv(doc.get("strengths", []))
-    doc["tags"] = _parse_list_or_csv(doc.get("tags", []))
+    doc["strengths"] = parse_list_or_csv(doc.get("strengths", []))
+    doc["tags"] = parse_list_or_csv(doc.get("tags", []))
     return doc
 
 class PaginatedUniversityResponse(BaseModel):
-    """分页大学响应模型"""
+    """分页大学响应模型（游标分页时不统计total/total_pages）"""
     universities: List[UniversityResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
+
+_PAGINATED_ADAPTER = TypeAdapter(PaginatedUniversityResponse)
 
 # --- International collections compatibility layer (AU/UK/SG) ---
-INTERNATIONAL_COUNTRIES = {"Australia", "United Kingdom", "Singapore"}
+# 国家 -> 集合名路由表（模块加载时构建一次）
+_INTL_COLL_NAMES = {
+    "Australia": "university_au",
+    "United Kingdom": "university_uk",
+    "Singapore": "university_sg",
+}
+INTERNATIONAL_COUNTRIES = frozenset(_INTL_COLL_NAMES)
+
+def _count_cache_key(coll_name: str, filter_conditions: dict) -> str:
+    """按集合名与筛选条件生成总数缓存键（键排序后序列化，与参数顺序无关）"""
+    return coll_name + ":" + json.dumps(filter_conditions, sort_keys=True, default=str)
+
+def _has_text_clause(filter_conditions) -> bool:
+    """筛选条件中是否含有$text（可能嵌在$or/$and中）"""
+    if isinstance(filter_conditions, dict):
+        return any(k == "$text" or _has_text_clause(v) for k, v in filter_conditions.items())
+    if isinstance(filter_conditions, list):
+        return any(_has_text_clause(item) for item in filter_conditions)
+    return False
+
+async def _count_matching(collection, filter_conditions: dict) -> int:
+    """按筛选条件计数：count_documents在服务端是聚合$match，不允许$text嵌在$or中，
+    含$text的搜索条件改走find（允许$or中的$text）只取_id计数"""
+    if _has_text_clause(filter_conditions):
+        ids = await collection.find(filter_conditions, {"_id": 1}).max_time_ms(_QUERY_MAX_TIME_MS).to_list(length=None)
+        return len(ids)
+    return await collection.count_documents(filter_conditions, maxTimeMS=_QUERY_MAX_TIME_MS)
+
+async def _fetch_page_and_total(collection, coll_name: str, filter_conditions: dict, skip: int, page_size: int, projection: dict):
+    """取回当前页和总数：当前页走(rank, _id)索引排序的find；总数缓存命中时只查当前页，
+    否则与当前页并发计数（无筛选条件时用估算总数）"""
+    page = collection.find(filter_conditions, projection).sort(RANK_SORT).skip(skip).limit(page_size).batch_size(page_size).max_time_ms(_QUERY_MAX_TIME_MS).to_list(length=page_size)
+    count_key = _count_cache_key(coll_name, filter_conditions)
+    total = _count_cache.get(count_key)
+    if total is not None:
+        return await page, total
+    
+    if filter_conditions:
+        count = _count_matching(collection, filter_conditions)
+    else:
+        # 无筛选条件时总数直接取集合元数据（不扫描索引）
+        count = collection.estimated_document_count()
+    docs, total = await asyncio.gather(page, count)
+    _count_cache.set(count_key, total)
+    return docs, total
+
+def _build_search_filter(search: str) -> dict:
+    """搜索条件：name_lc左锚定前缀匹配（走name_lc索引）或name/strengths文本索引检索"""
+    return {"$or": [
+        {"name_lc": {"$regex": f"^{re.escape(search.lower())}"}},
+        {"$text": {"$search": search}},
+    ]}
 
-def _parse_list_or_csv(value):
-    if isinstance(value, list):
-        return value
-    if isinstance(value, str):
-        return [s.strip() for s in value.split(',') if s.strip()]
-    return []
+# 前端可能使用 "USA"，但数据库中可能是 "United States" 或其他
+_US_COUNTRY_NAMES = ["USA", "United States", "US"]
+_COUNTRY_MAPPING = {name: _US_COUNTRY_NAMES for name in _US_COUNTRY_NAMES}
 
-async def _query_international(country: str, page: int, page_size: int, filter_conditions: dict):
+def _build_filter(country, rank_min, rank_max, tuition_max, type, strength, search) -> dict:
+    """根据列表接口的查询参数构建universities筛选条件（/ 与 /paginated 共用）"""
+    filter_conditions = {}
+    
+    if country:
+        # 如果是国际大学，直接使用
+        if country in INTERNATIONAL_COUNTRIES:
+            filter_conditions["country"] = country
+        # 如果是美国，需要处理多种可能的名称
+        elif country in _COUNTRY_MAPPING:
+            filter_conditions["country"] = {"$in": _COUNTRY_MAPPING[country]}
+        else:
+            filter_conditions["country"] = country
+    
+    if rank_min is not None or rank_max is not None:
+        rank_filter = {}
+        if rank_min is not None:
+            rank_filter["$gte"] = rank_min
+        if rank_max is not None:
+            rank_filter["$lte"] = rank_max
+        filter_conditions["rank"] = rank_filter
+    
+    if tuition_max:
+        filter_conditions["tuition"] = {"$lte": tuition_max}
+    
+    if type:
+        filter_conditions["type"] = type
+    
+    if strength:
+        filter_conditions["strengths"] = {"$in": [strength]}
+    
+    if search:
+        # 名称前缀走name_lc索引、专业走文本索引，避免不可走索引的不区分大小写$regex全表扫描
+        filter_conditions.update(_build_search_filter(search))
+    
+    return filter_conditions
+
+async def _query_international(country: str, page: int, page_size: int, filter_conditions: dict, search: Optional[str] = None):
     """Query AU/UK/SG collections and map to UniversityResponse compatible dicts."""
     db = get_db()
-    coll_name = {
-        "Australia": "university_au",
-        "United Kingdom": "university_uk",
-        "Singapore": "university_sg",
-    }[country]
+    coll_name = _INTL_COLL_NAMES[country]
     # 构建国际大学筛选条件
     intl_filter = {}
     
@@ -126,15 +242,11 @@ async def _query_international(country: str, page: int, page_size: int, filter_c
     # 收集所有需要$or的条件
     or_conditions = []
     
-    # 处理搜索（$or条件 - 搜索大学名称或专业）
-    if "$or" in filter_conditions:
-        # 对于国际大学，搜索name字段和strengths数组
-        for condition in filter_conditions["$or"]:
-            if "name" in condition:
-                or_conditions.append(condition)
-            if "strengths" in condition:
-                # 在strengths数组中搜索
-                or_conditions.append({"strengths": condition["strengths"]})
+    # 处理搜索（搜索大学名称或专业）
+    if search:
+        # 国际大学集合数据量小且没有name_lc/文本索引，使用name字段和strengths数组的正则匹配
+        or_conditions.append({"name": {"$regex": search, "$options": "i"}})
+        or_conditions.append({"strengths": {"$regex": search, "$options": "i"}})
     
     # 处理学费筛选（国际大学使用tuition_usd或tuition_local）
     # 注意：学费筛选应该与搜索条件组合（AND关系），但学费的两个字段之间是OR关系
@@ -163,15 +275,18 @@ async def _query_international(country: str, page: int, page_size: int, filter_c
     # 调试：打印查询条件
     print(f"🔍 查询国际大学 ({country}): {intl_filter}")
     
-    cursor = getattr(db, coll_name).find(intl_filter).skip((page - 1) * page_size).limit(page_size).sort("rank", 1)
-    docs = await cursor.to_list(length=page_size)
+    docs, total = await _fetch_page_and_total(
+        getattr(db, coll_name), coll_name, intl_filter, (page - 1) * page_size, page_size, _INTERNATIONAL_LIST_PROJECTION
+    )
     
     print(f"📊 查询到 {len(docs)} 所{country}大学")
     results = []
     for d in docs:
-        strengths = _parse_list_or_csv(d.get("strengths", []))
+        # 国际集合字段不保证齐全，仍需带默认值读取；预先绑定get省去每个字段的方法查找
+        get = d.get
+        strengths = parse_list_or_csv(get("strengths", []))
         # 获取学费（优先使用tuition_usd，如果没有则使用tuition_local）
-        tuition_val = d.get("tuition_usd") or d.get("tuition_local")
+        tuition_val = get("tuition_usd") or get("tuition_local")
         if tuition_val is None:
             tuition_val = 0
         elif isinstance(tuition_val, (int, float)):
@@ -180,29 +295,42 @@ async def _query_international(country: str, page: int, page_size: int, filter_c
             tuition_val = 0
         
         results.append({
-            "id": str(d.get("_id")),
-            "name": d.get("name"),
-            "country": d.get("country", country),
-            "state": d.get("city", ""),
-            "rank": d.get("rank", 9999),
+            "id": str(d["_id"]),
+            "name": get("name"),
+            "country": get("country", country),
+            "state": get("city", ""),
+            "rank": get("rank", 9999),
             "tuition": tuition_val,
-            "intl_rate": float(d.get("intlRate", 0) or 0.0),
+            "intl_rate": float(get("intlRate", 0) or 0.0),
             # reuse "type" to carry currency to avoid breaking UI
-            "type": d.get("currency", "public"),
+            "type": get("currency", "public"),
             "strengths": strengths,
             # reuse gpt_summary slot to show website as placeholder
-            "gpt_summary": d.get("website", ""),
+            "gpt_summary": get("website", ""),
             "logo_url": None,
         })
-    # Count total (fallback if not supported)
-    try:
-        total = await getattr(db, coll_name).count_documents(intl_filter)
-    except Exception:
-        total = len(results)
     return results, total
 
+def _to_university_response(uni: dict) -> UniversityResponse:
+    """将universities集合文档转换为响应模型（数据来自库内已清洗的数据，跳过逐条校验）"""
+    return UniversityResponse.model_construct(
+        id=str(uni["_id"]),
+        name=uni["name"],
+        country=uni["country"],
+        state=uni["state"],
+        rank=uni["rank"],
+        tuition=uni["tuition"],
+        intl_rate=uni["intlRate"],
+        type=uni["type"],
+        strengths=uni["strengths"],
+        gpt_summary=uni["gptSummary"],
+        logo_url=uni.get("logoUrl")
+    )
+
 @router.get("/", response_model=List[UniversityResponse])
 async def get_universities(
+    request: Request,
+    response: Response,
     country: Optional[str] = Query(None, description="国家筛选"),
     rank_min: Optional[int] = Query(None, description="最低排名"),
     rank_max: Optional[int] = Query(None, description="最高排名"),
@@ -211,7 +339,8 @@ async def get_universities(
     strength: Optional[str] = Query(None, description="优势专业"),
     search: Optional[str] = Query(None, description="搜索关键词"),
     page: int = Query(1, description="页码，从1开始", ge=1),
-    page_size: int = Query(9, description="每页显示数量，默认9所")  # 改为9，支持3×3网格
+    page_size: int = Query(9, description="每页显示数量，默认9所"),  # 改为9，支持3×3网格
+    cursor: Optional[str] = Query(None, description="上一页响应头X-Next-Cursor的值；提供时按(rank, _id)游标翻页")
 ):
     """获取大学列表，支持多种筛选条件和分页"""
     db = get_db()
@@ -220,80 +349,40 @@ async def get_universities(
     skip = (page - 1) * page_size
     
     # 构建查询条件
-    filter_conditions = {}
-    
-    if country:
-        # 处理国家名称映射：前端可能使用 "USA"，但数据库中可能是 "United States" 或其他
-        country_mapping = {
-            "USA": ["USA", "United States", "US"],
-            "United States": ["USA", "United States", "US"],
-            "US": ["USA", "United States", "US"],
-        }
-        # 如果是国际大学，直接使用
-        if country in INTERNATIONAL_COUNTRIES:
-            filter_conditions["country"] = country
-        # 如果是美国，需要处理多种可能的名称
-        elif country in country_mapping:
-            filter_conditions["country"] = {"$in": country_mapping[country]}
-        else:
-            filter_conditions["country"] = country
+    filter_conditions = _build_filter(country, rank_min, rank_max, tuition_max, type, strength, search)
     
-    if rank_min is not None or rank_max is not None:
-        rank_filter = {}
-        if rank_min is not None:
-            rank_filter["$gte"] = rank_min
-        if rank_max is not None:
-            rank_filter["$lte"] = rank_max
-        filter_conditions["rank"] = rank_filter
-    
-    if tuition_max:
-        filter_conditions["tuition"] = {"$lte": tuition_max}
-    
-    if type:
-        filter_conditions["type"] = type
-    
-    if strength:
-        filter_conditions["strengths"] = {"$in": [strength]}
-    
-    if search:
-        filter_conditions["$or"] = [
-            {"name": {"$regex": search, "$options": "i"}},
-            {"strengths": {"$regex": search, "$options": "i"}}
-        ]
     # International collections handling
     if country in INTERNATIONAL_COUNTRIES:
-        intl_results, _ = await _query_international(country, page, page_size, filter_conditions)
-        return [UniversityResponse(**r) for r in intl_results]
+        intl_results, _ = await _query_international(country, page, page_size, filter_conditions, search)
+        return _cacheable_json(request, response, _UNIVERSITY_LIST_ADAPTER, [UniversityResponse.model_construct(**r) for r in intl_results])
     
-    # 执行分页查询
+    # 执行分页查询：提供游标时按(rank, _id)定位起点，避免skip逐条跳过文档
     try:
-        cursor = db.universities.find(filter_conditions).skip(skip).limit(page_size).sort("rank", 1)
-        universities = await cursor.to_list(length=page_size)
+        if cursor:
+            filter_conditions = apply_rank_cursor(filter_conditions, cursor)
+            uni_cursor = db.universities.find(filter_conditions, _UNIVERSITY_LIST_PROJECTION).sort(RANK_SORT)
+        else:
+            uni_cursor = db.universities.find(filter_conditions, _UNIVERSITY_LIST_PROJECTION).sort(RANK_SORT).skip(skip)
+        # 多取一条用于判断是否还有下一页
+        universities = await uni_cursor.limit(page_size + 1).batch_size(page_size + 1).max_time_ms(_QUERY_MAX_TIME_MS).to_list(length=page_size + 1)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"查询失败: {e}")
-        universities = []
+        # 降级结果不带ETag/Cache-Control，避免被客户端当作真实数据缓存
+        return []
     
-    # 转换为响应格式 - 保持向后兼容，返回数组
-    result = []
-    for uni in universities:
-        result.append(UniversityResponse(
-            id=str(uni["_id"]),
-            name=uni["name"],
-            country=uni["country"],
-            state=uni["state"],
-            rank=uni["rank"],
-            tuition=uni["tuition"],
-            intl_rate=uni["intlRate"],
-            type=uni["type"],
-            strengths=uni["strengths"],
-            gpt_summary=uni["gptSummary"],
-            logo_url=uni.get("logoUrl")
-        ))
+    if len(universities) > page_size:
+        universities = universities[:page_size]
+        response.headers["X-Next-Cursor"] = encode_rank_cursor(universities[-1])
     
-    return result
+    # 转换为响应格式 - 保持向后兼容，返回数组
+    return _cacheable_json(request, response, _UNIVERSITY_LIST_ADAPTER, [_to_university_response(uni) for uni in universities])
 
 @router.get("/paginated", response_model=PaginatedUniversityResponse)
 async def get_universities_paginated(
+    request: Request,
+    response: Response,
     country: Optional[str] = Query(None, description="国家筛选"),
     rank_min: Optional[int] = Query(None, description="最低排名"),
     rank_max: Optional[int] = Query(None, description="最高排名"),
@@ -302,7 +391,8 @@ async def get_universities_paginated(
     strength: Optional[str] = Query(None, description="优势专业"),
     search: Optional[str] = Query(None, description="搜索关键词"),
     page: int = Query(1, description="页码，从1开始", ge=1),
-    page_size: int = Query(9, description="每页显示数量，默认9所")
+    page_size: int = Query(9, description="每页显示数量，默认9所"),
+    cursor: Optional[str] = Query(None, description="上一页返回的next_cursor；提供时按(rank, _id)游标翻页，不再统计总数")
 ):
     """获取大学列表（分页版本），支持多种筛选条件和分页信息"""
     try:
@@ -323,96 +413,58 @@ async def get_universities_paginated(
         skip = (page - 1) * page_size
         
         # 构建查询条件
-        filter_conditions = {}
-        
-        if country:
-            # 处理国家名称映射：前端可能使用 "USA"，但数据库中可能是 "United States" 或其他
-            country_mapping = {
-                "USA": ["USA", "United States", "US"],
-                "United States": ["USA", "United States", "US"],
-                "US": ["USA", "United States", "US"],
-            }
-            # 如果是国际大学，直接使用
-            if country in INTERNATIONAL_COUNTRIES:
-                filter_conditions["country"] = country
-            # 如果是美国，需要处理多种可能的名称
-            elif country in country_mapping:
-                filter_conditions["country"] = {"$in": country_mapping[country]}
-            else:
-                filter_conditions["country"] = country
-    
-        if rank_min is not None or rank_max is not None:
-            rank_filter = {}
-            if rank_min is not None:
-                rank_filter["$gte"] = rank_min
-            if rank_max is not None:
-                rank_filter["$lte"] = rank_max
-            filter_conditions["rank"] = rank_filter
-        
-        if tuition_max:
-            filter_conditions["tuition"] = {"$lte": tuition_max}
-        
-        if type:
-            filter_conditions["type"] = type
-        
-        if strength:
-            filter_conditions["strengths"] = {"$in": [strength]}
-        
-        if search:
-            filter_conditions["$or"] = [
-                {"name": {"$regex": search, "$options": "i"}},
-                {"strengths": {"$regex": search, "$options": "i"}}
-            ]
+        filter_conditions = _build_filter(country, rank_min, rank_max, tuition_max, type, strength, search)
         
         # International collections handling (must be checked before querying db.universities)
         if country in INTERNATIONAL_COUNTRIES:
-            intl_results, total = await _query_international(country, page, page_size, filter_conditions)
+            intl_results, total = await _query_international(country, page, page_size, filter_conditions, search)
             total_pages = (total + page_size - 1) // page_size
             has_next = page < total_pages
             has_prev = page > 1
-            return PaginatedUniversityResponse(
-                universities=[UniversityResponse(**r) for r in intl_results],
+            return _cacheable_json(request, response, _PAGINATED_ADAPTER, PaginatedUniversityResponse(
+                universities=[UniversityResponse.model_construct(**r) for r in intl_results],
                 total=total,
                 page=page,
                 page_size=page_size,
                 total_pages=total_pages,
                 has_next=has_next,
                 has_prev=has_prev
-            )
+            ))
         
-        # 获取总数
-        try:
-            if hasattr(db.universities, 'count_documents'):
-                total = await db.universities.count_documents(filter_conditions)
-            else:
-                # 尝试同步方法
-                total = db.universities.count_documents(filter_conditions)
-        except Exception as e:
-            print(f"获取总数失败: {e}")
-            # 尝试同步方法作为回退
-            try:
-                total = db.universities.count_documents(filter_conditions)
-            except:
-                total = 50  # 默认值
+        # 游标分页：用(rank, _id)定位起点，避免skip逐条跳过文档，并省去count统计
+        if cursor:
+            filter_conditions = apply_rank_cursor(filter_conditions, cursor)
+            
+            # 多取一条用于判断是否还有下一页
+            universities = await db.universities.find(filter_conditions, _UNIVERSITY_LIST_PROJECTION).sort(RANK_SORT).limit(page_size + 1).batch_size(page_size + 1).max_time_ms(_QUERY_MAX_TIME_MS).to_list(length=page_size + 1)
+            has_next = len(universities) > page_size
+            universities = universities[:page_size]
+            
+            return _cacheable_json(request, response, _PAGINATED_ADAPTER, PaginatedUniversityResponse(
+                universities=[_to_university_response(uni) for uni in universities],
+                page=page,
+                page_size=page_size,
+                has_next=has_next,
+                has_prev=True,
+                next_cursor=encode_rank_cursor(universities[-1]) if has_next else None
+            ))
         
         # 调试：打印查询条件
         print(f"🔍 查询条件: {filter_conditions}")
-        print(f"📊 总数: {total}")
-            
-        # 执行分页查询
+        
+        # 执行分页查询：当前页与总数并发取回（总数按筛选条件缓存）
+        # （以_id作为同排名时的次序，保证与游标分页顺序一致）
+        query_failed = False
         try:
-            cursor = db.universities.find(filter_conditions).skip(skip).limit(page_size).sort("rank", 1)
-            universities = await cursor.to_list(length=page_size)
-            print(f"✅ 查询到 {len(universities)} 所大学")
+            universities, total = await _fetch_page_and_total(
+                db.universities, "universities", filter_conditions, skip, page_size, _UNIVERSITY_LIST_PROJECTION
+            )
+            print(f"📊 总数: {total}，✅ 查询到 {len(universities)} 所大学")
         except Exception as e:
             print(f"查询失败: {e}")
-            # 尝试同步方法作为回退
-            try:
-                universities = list(db.universities.find(filter_conditions).skip(skip).limit(page_size).sort("rank", 1))
-                print(f"✅ 同步查询到 {len(universities)} 所大学")
-            except Exception as e2:
-                print(f"同步查询也失败: {e2}")
-                universities = []
+            universities = []
+            total = 0
+            query_failed = True
         
         # 计算分页信息
         total_pages = (total + page_size - 1) // page_size
@@ -420,31 +472,24 @@ async def get_universities_paginated(
         has_prev = page > 1
         
         # 转换为响应格式
-        result = []
-        for uni in universities:
-            result.append(UniversityResponse(
-                id=str(uni["_id"]),
-                name=uni["name"],
-                country=uni["country"],
-                state=uni["state"],
-                rank=uni["rank"],
-                tuition=uni["tuition"],
-                intl_rate=uni["intlRate"],
-                type=uni["type"],
-                strengths=uni["strengths"],
-                gpt_summary=uni["gptSummary"],
-                logo_url=uni.get("logoUrl")
-            ))
+        result = [_to_university_response(uni) for uni in universities]
         
-        return PaginatedUniversityResponse(
+        payload = PaginatedUniversityResponse(
             universities=result,
             total=total,
             page=page,
             page_size=page_size,
             total_pages=total_pages,
             has_next=has_next,
-            has_prev=has_prev
+            has_prev=has_prev,
+            next_cursor=encode_rank_cursor(universities[-1]) if has_next and universities else None
         )
+        if query_failed:
+            # 降级结果不带ETag/Cache-Control，避免被客户端当作真实数据缓存
+            return payload
+        return _cacheable_json(request, response, _PAGINATED_ADAPTER, payload)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"获取大学列表失败: {e}")
         import traceback
@@ -465,12 +510,11 @@ async def get_university(university_id: str):
     """获取特定大学详情"""
     db = get_db()
     
-    try:
-        uni_id = ObjectId(university_id)
-    except:
+    if not ObjectId.is_valid(university_id):
         raise HTTPException(status_code=400, detail="无效的大学ID")
+    uni_id = ObjectId(university_id)
     
-    university = await db.universities.find_one({"_id": uni_id})
+    university = await db.universities.find_one({"_id": uni_id}, _UNIVERSITY_DETAIL_PROJECTION)
     if not university:
         raise HTTPException(status_code=404, detail="大学不存在")
     
@@ -514,11 +558,17 @@ async def get_countries():
             # 如果数据库未连接，返回默认国家列表
             return {"countries": ["USA", "Australia", "United Kingdom", "Singapore"]}
     
+        cached = _countries_cache.get("countries")
+        if cached is not None:
+            return {"countries": cached}
+        
         countries = await db.universities.distinct("country")
         # 确保包含所有支持的国家
         all_countries = set(countries) if countries else set()
         all_countries.update(["USA", "Australia", "United Kingdom", "Singapore"])
-        return {"countries": sorted(list(all_countries))}
+        result = sorted(list(all_countries))
+        _countries_cache.set("countries", result)
+        return {"countries": result}
     except Exception as e:
         print(f"获取国家列表失败: {e}")
         # 返回默认国家列表，避免500错误
@@ -534,33 +584,31 @@ async def get_strengths_list(
         if db is None:
             return {"strengths": []}
         
-        all_strengths = set()
+        cached = _strengths_cache.get(country)
+        if cached is not None:
+            return {"strengths": cached}
         
-        # 如果有国家筛选
+        # 由MongoDB在服务端展开数组并去重（可走strengths多键索引），只传输去重后的值
         if country and country in INTERNATIONAL_COUNTRIES:
             # 从对应的国际大学集合获取
-            coll_name = {
-                "Australia": "university_au",
-                "United Kingdom": "university_uk",
-                "Singapore": "university_sg",
-            }[country]
-            universities = await getattr(db, coll_name).find({}, {"strengths": 1}).to_list(None)
+            values = await getattr(db, _INTL_COLL_NAMES[country]).distinct("strengths")
         else:
             # 如果没有国家筛选或有国家但不是国际大学，从universities集合获取
             filter_condition = {}
             if country:
                 filter_condition["country"] = country
-            universities = await db.universities.find(filter_condition, {"strengths": 1}).to_list(None)
+            values = await db.universities.distinct("strengths", filter_condition)
         
-        # 提取所有strengths并去重
-        for uni in universities:
-            if "strengths" in uni:
-                strengths = _parse_list_or_csv(uni["strengths"])
-                for strength in strengths:
-                    if strength and isinstance(strength, str):
-                        all_strengths.add(strength.strip())
+        # 旧数据中strengths可能是逗号分隔字符串，distinct会原样返回，这里再拆分一次
+        all_strengths = set()
+        for value in values:
+            for strength in parse_list_or_csv(value):
+                if strength and isinstance(strength, str):
+                    all_strengths.add(strength.strip())
         
-        return {"strengths": sorted(list(all_strengths))}
+        result = sorted(list(all_strengths))
+        _strengths_cache.set(country, result)
+        return {"strengths": result}
     except Exception as e:
         print(f"获取strengths失败: {e}")
         return {"strengths": []} 
\ No newline at end of file
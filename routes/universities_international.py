@@ -1,8 +1,15 @@
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Query, Response
 from typing import List, Optional
 from bson import ObjectId
+from pydantic import BaseModel, TypeAdapter
+from pymongo.errors import ExecutionTimeout
 
 from db.mongo import get_db
+from utils.cache import TTLCache
+from utils.pagination import RANK_SORT, apply_rank_cursor, encode_rank_cursor
+from utils.parsing import parse_list_or_csv
 from models.university_au import UniversityAUResponse
 from models.university_uk import UniversityUKResponse
 from models.university_sg import UniversitySGResponse
@@ -10,13 +17,161 @@ from models.university_sg import UniversitySGResponse
 
 router = APIRouter()
 
+# 只取回响应模型用到的字段（id由_id生成），列表和详情共用
+_AU_PROJECTION = {name: 1 for name in UniversityAUResponse.model_fields if name != "id"}
+_UK_PROJECTION = {name: 1 for name in UniversityUKResponse.model_fields if name != "id"}
+_SG_PROJECTION = {name: 1 for name in UniversitySGResponse.model_fields if name != "id"}
 
-def _parse_strengths(value):
-    if isinstance(value, list):
-        return value
-    if isinstance(value, str):
-        return [s.strip() for s in value.split(",") if s.strip()]
-    return []
+# 列表接口直接用TypeAdapter序列化为JSON字节返回，跳过FastAPI按response_model
+# 逐请求重新校验+序列化的流程（response_model仍保留用于生成OpenAPI文档）
+_AU_LIST_ADAPTER = TypeAdapter(List[UniversityAUResponse])
+_UK_LIST_ADAPTER = TypeAdapter(List[UniversityUKResponse])
+_SG_LIST_ADAPTER = TypeAdapter(List[UniversitySGResponse])
+
+# 国际大学数据只由导入脚本更新，列表按查询参数缓存60秒、详情按ID缓存5分钟，
+# 命中时省去数据库往返和响应模型校验
+_list_cache = TTLCache(60, maxsize=512)
+_detail_cache = TTLCache(300, maxsize=2048)
+
+# 列表查询的服务端超时，异常过滤条件导致的慢查询尽早失败而不是占住连接
+_QUERY_MAX_TIME_MS = 500
+
+
+def _to_response(model, d: dict):
+    """原地补齐id/strengths/tags后构建响应模型（文档由驱动新建，可直接修改，省去逐条复制整个dict）"""
+    d["id"] = str(d.pop("_id"))
+    d["strengths"] = parse_list_or_csv(d.get("strengths", []))
+    d["tags"] = parse_list_or_csv(d.get("tags", []))
+    return model(**d)
+
+
+def _int_or_keep(value):
+    """导入数据中的整数字段可能以float存储，转回int"""
+    return int(value) if isinstance(value, float) else value
+
+
+def _au_from_doc(d: dict) -> UniversityAUResponse:
+    """澳洲大学文档 -> 响应模型，缺失字段补默认值并处理数值类型转换"""
+    return UniversityAUResponse(
+        id=str(d["_id"]),
+        name=d.get("name", ""),
+        country=d.get("country", "Australia"),
+        city=d.get("city", ""),
+        rank=_int_or_keep(d.get("rank", 9999)),
+        tuition_local=int(d.get("tuition_local", 0)),
+        currency=d.get("currency", "AUD"),
+        tuition_usd=_int_or_keep(d.get("tuition_usd", 0)),
+        study_length_years=float(d.get("study_length_years", 3.0)),
+        intakes=d.get("intakes", ""),
+        english_requirements=d.get("english_requirements", ""),
+        requires_english_test=bool(d.get("requires_english_test", False)),
+        group_of_eight=bool(d.get("group_of_eight", False)),
+        work_integrated_learning=bool(d.get("work_integrated_learning", False)),
+        placement_rate=d.get("placement_rate"),
+        post_study_visa_years=float(d.get("post_study_visa_years", 2.0)),
+        scholarship_available=bool(d.get("scholarship_available", False)),
+        strengths=parse_list_or_csv(d.get("strengths", [])),
+        tags=parse_list_or_csv(d.get("tags", [])),
+        intlRate=float(d.get("intlRate", 0.0)),
+        website=d.get("website", ""),
+    )
+
+
+def _uk_from_doc(d: dict) -> UniversityUKResponse:
+    """英国大学文档 -> 响应模型，缺失字段补默认值并处理数值类型转换"""
+    intl_rate = d.get("intlRate")
+    return UniversityUKResponse(
+        id=str(d["_id"]),
+        name=d.get("name", ""),
+        country=d.get("country", "United Kingdom"),
+        city=d.get("city", ""),
+        rank=_int_or_keep(d.get("rank", 9999)),
+        tuition_local=int(d.get("tuition_local", 0)),
+        currency=d.get("currency", "GBP"),
+        tuition_usd=_int_or_keep(d.get("tuition_usd", 0)),
+        study_length_years=float(d.get("study_length_years", 3.0)),
+        ucas_deadline_type=d.get("ucas_deadline_type", ""),
+        typical_offer_alevel=d.get("typical_offer_alevel", ""),
+        typical_offer_ib=d.get("typical_offer_ib", ""),
+        foundation_available=bool(d.get("foundation_available", False)),
+        russell_group=bool(d.get("russell_group", False)),
+        placement_year_available=bool(d.get("placement_year_available", False)),
+        interview_required=bool(d.get("interview_required", False)),
+        admissions_tests=d.get("admissions_tests", "None"),
+        personal_statement_weight=_int_or_keep(d.get("personal_statement_weight", 0)),
+        strengths=parse_list_or_csv(d.get("strengths", [])),
+        tags=parse_list_or_csv(d.get("tags", [])),
+        intlRate=float(intl_rate) if intl_rate is not None else None,
+        website=d.get("website", ""),
+        scholarship_available=bool(d.get("scholarship_available", False)),
+    )
+
+
+async def _find_page(collection, filter_conditions: dict, projection: dict, page: int, page_size: int, cursor: Optional[str]):
+    """按(rank, _id)排序取一页：提供cursor时从游标处继续（不再skip），否则兼容page分页；
+    返回(文档列表, 下一页游标)，没有下一页时游标为None"""
+    if cursor:
+        uni_cursor = collection.find(apply_rank_cursor(filter_conditions, cursor), projection)
+    else:
+        uni_cursor = collection.find(filter_conditions, projection).skip((page - 1) * page_size)
+    # 多取一条用于判断是否还有下一页
+    docs = await uni_cursor.sort(RANK_SORT).limit(page_size + 1).batch_size(page_size + 1).max_time_ms(_QUERY_MAX_TIME_MS).to_list(length=page_size + 1)
+    if len(docs) > page_size:
+        docs = docs[:page_size]
+        return docs, encode_rank_cursor(docs[-1])
+    return docs, None
+
+
+async def _cached_page(coll_name: str, model, projection: dict, filter_conditions: dict, page: int, page_size: int, cursor: Optional[str]):
+    """先查缓存，未命中时取一页并构建响应模型；返回(响应模型列表, 下一页游标)"""
+    cache_key = (coll_name, json.dumps(filter_conditions, sort_keys=True), page, page_size, cursor)
+    cached = _list_cache.get(cache_key)
+    if cached is None:
+        try:
+            docs, next_cursor = await _find_page(getattr(get_db(), coll_name), filter_conditions, projection, page, page_size, cursor)
+        except ExecutionTimeout:
+            print(f"⚠️ 查询超时: {coll_name} filter={filter_conditions}")
+            raise HTTPException(status_code=503, detail="查询超时，请缩小筛选范围后重试")
+        cached = ([_to_response(model, d) for d in docs], next_cursor)
+        _list_cache.set(cache_key, cached)
+    return cached
+
+
+async def _list_page(coll_name: str, model, adapter: TypeAdapter, projection: dict, filter_conditions: dict, page: int, page_size: int, cursor: Optional[str]) -> Response:
+    """列表接口公共流程：结果由adapter直接序列化为响应体，下一页游标通过X-Next-Cursor响应头返回"""
+    results, next_cursor = await _cached_page(coll_name, model, projection, filter_conditions, page, page_size, cursor)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return Response(content=adapter.dump_json(results), media_type="application/json", headers=headers)
+
+
+class CombinedInternationalResponse(BaseModel):
+    """澳/英/新三国大学列表合并响应"""
+    au: List[UniversityAUResponse]
+    uk: List[UniversityUKResponse]
+    sg: List[UniversitySGResponse]
+
+
+@router.get("/combined", response_model=CombinedInternationalResponse)
+async def list_combined_universities(
+    rank_max: Optional[int] = None,
+    strength: Optional[str] = None,
+    page_size: int = Query(50, ge=1, le=200),
+):
+    """一次请求返回三国大学首页，三个集合并发查询（耗时取最慢的一个而不是三者之和）"""
+    def build_filter(country: str) -> dict:
+        filter_conditions = {"country": country}
+        if rank_max is not None:
+            filter_conditions["rank"] = {"$lte": rank_max}
+        if strength:
+            filter_conditions["strengths"] = {"$in": [strength]}
+        return filter_conditions
+
+    (au, _), (uk, _), (sg, _) = await asyncio.gather(
+        _cached_page("university_au", UniversityAUResponse, _AU_PROJECTION, build_filter("Australia"), 1, page_size, None),
+        _cached_page("university_uk", UniversityUKResponse, _UK_PROJECTION, build_filter("United Kingdom"), 1, page_size, None),
+        _cached_page("university_sg", UniversitySGResponse, _SG_PROJECTION, build_filter("Singapore"), 1, page_size, None),
+    )
+    return CombinedInternationalResponse.model_construct(au=au, uk=uk, sg=sg)
 
 
 @router.get("/au", response_model=List[UniversityAUResponse])
@@ -28,8 +183,8 @@ async def list_au_universities(
     strength: Optional[str] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="上一页响应头X-Next-Cursor的值；提供时按(rank, _id)游标翻页"),
 ):
-    db = get_db()
     filter_conditions = {"country": "Australia"}
     if city:
         filter_conditions["city"] = city
@@ -42,71 +197,7 @@ async def list_au_universities(
     if strength:
         filter_conditions["strengths"] = {"$in": [strength]}
 
-    cursor = db.university_au.find(filter_conditions).skip((page - 1) * page_size).limit(page_size).sort("rank", 1)
-    docs = await cursor.to_list(length=page_size)
-    return [UniversityAUResponse(id=str(d["_id"]), **{**d, "strengths": _parse_strengths(d.get("strengths", [])), "tags": _parse_strengths(d.get("tags", []))}) for d in docs]
-
-
-@router.get("/au/{id}", response_model=UniversityAUResponse)
-async def get_au_university(id: str):
-    db = get_db()
-    if db is None:
-        raise HTTPException(status_code=503, detail="数据库未连接")
-    
-    try:
-        oid = ObjectId(id)
-    except Exception as e:
-        print(f"❌ 无效的ID格式: {id}, 错误: {e}")
-        raise HTTPException(status_code=400, detail=f"无效的ID格式: {id}")
-    
-    try:
-        d = await db.university_au.find_one({"_id": oid})
-        if not d:
-            print(f"❌ 未找到大学: ID={id}")
-            raise HTTPException(status_code=404, detail="未找到大学")
-        
-        # 确保返回的数据包含所有必需字段
-        # 处理数值类型转换
-        tuition_usd_val = d.get("tuition_usd", 0)
-        if isinstance(tuition_usd_val, float):
-            tuition_usd_val = int(tuition_usd_val)
-        
-        rank_val = d.get("rank", 9999)
-        if isinstance(rank_val, float):
-            rank_val = int(rank_val)
-        
-        result_data = {
-            "id": str(d["_id"]),
-            "name": d.get("name", ""),
-            "country": d.get("country", "Australia"),
-            "city": d.get("city", ""),
-            "rank": rank_val,
-            "tuition_local": int(d.get("tuition_local", 0)),
-            "currency": d.get("currency", "AUD"),
-            "tuition_usd": tuition_usd_val,
-            "study_length_years": float(d.get("study_length_years", 3.0)),
-            "intakes": d.get("intakes", ""),
-            "english_requirements": d.get("english_requirements", ""),
-            "requires_english_test": bool(d.get("requires_english_test", False)),
-            "group_of_eight": bool(d.get("group_of_eight", False)),
-            "work_integrated_learning": bool(d.get("work_integrated_learning", False)),
-            "placement_rate": d.get("placement_rate"),
-            "post_study_visa_years": float(d.get("post_study_visa_years", 2.0)),
-            "scholarship_available": bool(d.get("scholarship_available", False)),
-            "strengths": _parse_strengths(d.get("strengths", [])),
-            "tags": _parse_strengths(d.get("tags", [])),
-            "intlRate": float(d.get("intlRate", 0.0)),
-            "website": d.get("website", "")
-        }
-        
-        return UniversityAUResponse(**result_data)
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"❌ 获取澳大利亚大学详情失败: ID={id}, 错误: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"服务器错误: {str(e)}")
+    return await _list_page("university_au", UniversityAUResponse, _AU_LIST_ADAPTER, _AU_PROJECTION, filter_conditions, page, page_size, cursor)
 
 
 @router.get("/uk", response_model=List[UniversityUKResponse])
@@ -119,8 +210,8 @@ async def list_uk_universities(
     strength: Optional[str] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="上一页响应头X-Next-Cursor的值；提供时按(rank, _id)游标翻页"),
 ):
-    db = get_db()
     filter_conditions = {"country": "United Kingdom"}
     if city:
         filter_conditions["city"] = city
@@ -135,82 +226,7 @@ async def list_uk_universities(
     if strength:
         filter_conditions["strengths"] = {"$in": [strength]}
 
-    cursor = db.university_uk.find(filter_conditions).skip((page - 1) * page_size).limit(page_size).sort("rank", 1)
-    docs = await cursor.to_list(length=page_size)
-    return [UniversityUKResponse(id=str(d["_id"]), **{**d, "strengths": _parse_strengths(d.get("strengths", [])), "tags": _parse_strengths(d.get("tags", []))}) for d in docs]
-
-
-@router.get("/uk/{id}", response_model=UniversityUKResponse)
-async def get_uk_university(id: str):
-    db = get_db()
-    if db is None:
-        raise HTTPException(status_code=503, detail="数据库未连接")
-    
-    try:
-        oid = ObjectId(id)
-    except Exception as e:
-        print(f"❌ 无效的ID格式: {id}, 错误: {e}")
-        raise HTTPException(status_code=400, detail=f"无效的ID格式: {id}")
-    
-    try:
-        d = await db.university_uk.find_one({"_id": oid})
-        if not d:
-            print(f"❌ 未找到大学: ID={id}")
-            raise HTTPException(status_code=404, detail="未找到大学")
-        
-        # 确保返回的数据包含所有必需字段，处理数据类型转换
-        tuition_usd_val = d.get("tuition_usd", 0)
-        if isinstance(tuition_usd_val, float):
-            tuition_usd_val = int(tuition_usd_val)
-        
-        rank_val = d.get("rank", 9999)
-        if isinstance(rank_val, float):
-            rank_val = int(rank_val)
-        
-        personal_statement_weight_val = d.get("personal_statement_weight", 0)
-        if isinstance(personal_statement_weight_val, float):
-            personal_statement_weight_val = int(personal_statement_weight_val)
-        
-        intl_rate = d.get("intlRate")
-        if intl_rate is not None:
-            intl_rate = float(intl_rate)
-        else:
-            intl_rate = None
-        
-        result_data = {
-            "id": str(d["_id"]),
-            "name": d.get("name", ""),
-            "country": d.get("country", "United Kingdom"),
-            "city": d.get("city", ""),
-            "rank": rank_val,
-            "tuition_local": int(d.get("tuition_local", 0)),
-            "currency": d.get("currency", "GBP"),
-            "tuition_usd": tuition_usd_val,
-            "study_length_years": float(d.get("study_length_years", 3.0)),
-            "ucas_deadline_type": d.get("ucas_deadline_type", ""),
-            "typical_offer_alevel": d.get("typical_offer_alevel", ""),
-            "typical_offer_ib": d.get("typical_offer_ib", ""),
-            "foundation_available": bool(d.get("foundation_available", False)),
-            "russell_group": bool(d.get("russell_group", False)),
-            "placement_year_available": bool(d.get("placement_year_available", False)),
-            "interview_required": bool(d.get("interview_required", False)),
-            "admissions_tests": d.get("admissions_tests", "None"),
-            "personal_statement_weight": personal_statement_weight_val,
-            "strengths": _parse_strengths(d.get("strengths", [])),
-            "tags": _parse_strengths(d.get("tags", [])),
-            "intlRate": intl_rate,
-            "website": d.get("website", ""),
-            "scholarship_available": bool(d.get("scholarship_available", False))
-        }
-        
-        return UniversityUKResponse(**result_data)
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"❌ 获取英国大学详情失败: ID={id}, 错误: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"服务器错误: {str(e)}")
+    return await _list_page("university_uk", UniversityUKResponse, _UK_LIST_ADAPTER, _UK_PROJECTION, filter_conditions, page, page_size, cursor)
 
 
 @router.get("/sg", response_model=List[UniversitySGResponse])
@@ -220,8 +236,8 @@ async def list_sg_universities(
     strength: Optional[str] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="上一页响应头X-Next-Cursor的值；提供时按(rank, _id)游标翻页"),
 ):
-    db = get_db()
     filter_conditions = {"country": "Singapore"}
     if rank_max is not None:
         filter_conditions["rank"] = {"$lte": rank_max}
@@ -230,22 +246,53 @@ async def list_sg_universities(
     if strength:
         filter_conditions["strengths"] = {"$in": [strength]}
 
-    cursor = db.university_sg.find(filter_conditions).skip((page - 1) * page_size).limit(page_size).sort("rank", 1)
-    docs = await cursor.to_list(length=page_size)
-    return [UniversitySGResponse(id=str(d["_id"]), **{**d, "strengths": _parse_strengths(d.get("strengths", [])), "tags": _parse_strengths(d.get("tags", []))}) for d in docs]
+    return await _list_page("university_sg", UniversitySGResponse, _SG_LIST_ADAPTER, _SG_PROJECTION, filter_conditions, page, page_size, cursor)
 
 
-@router.get("/sg/{id}", response_model=UniversitySGResponse)
-async def get_sg_university(id: str):
-    db = get_db()
-    try:
-        oid = ObjectId(id)
-    except Exception:
-        raise HTTPException(status_code=400, detail="无效的ID")
-    d = await db.university_sg.find_one({"_id": oid})
-    if not d:
-        raise HTTPException(status_code=404, detail="未找到大学")
-    return UniversitySGResponse(id=str(d["_id"]), **{**d, "strengths": _parse_strengths(d.get("strengths", [])), "tags": _parse_strengths(d.get("tags", []))})
-
+def _make_detail_handler(coll_name: str, projection: dict, build):
+    """生成详情接口：集合名/投影/构建函数作为闭包变量绑定，三国共用同一套校验、缓存和错误处理"""
+    async def get_university(id: str):
+        db = get_db()
+        if db is None:
+            raise HTTPException(status_code=503, detail="数据库未连接")
+        
+        if not ObjectId.is_valid(id):
+            print(f"❌ 无效的ID格式: {id}")
+            raise HTTPException(status_code=400, detail=f"无效的ID格式: {id}")
+        
+        cache_key = (coll_name, id)
+        cached = _detail_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            d = await getattr(db, coll_name).find_one({"_id": ObjectId(id)}, projection)
+            if not d:
+                print(f"❌ 未找到大学: ID={id}")
+                raise HTTPException(status_code=404, detail="未找到大学")
+            result = build(d)
+            _detail_cache.set(cache_key, result)
+            return result
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"❌ 获取大学详情失败: {coll_name} ID={id}, 错误: {e}")
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"服务器错误: {str(e)}")
+    
+    return get_university
 
 
+for _code, _model, _projection, _build in (
+    ("au", UniversityAUResponse, _AU_PROJECTION, _au_from_doc),
+    ("uk", UniversityUKResponse, _UK_PROJECTION, _uk_from_doc),
+    ("sg", UniversitySGResponse, _SG_PROJECTION, lambda d: _to_response(UniversitySGResponse, d)),
+):
+    router.add_api_route(
+        f"/{_code}/{{id}}",
+        _make_detail_handler(f"university_{_code}", _projection, _build),
+        methods=["GET"],
+        response_model=_model,
+        name=f"get_{_code}_university",
+    )
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException
 from typing import Optional
 from datetime import datetime
+from bson import ObjectId
 
-from models.user import User, UserCreate, UserResponse
+from models.user import UserCreate, UserResponse
 from db.mongo import get_db
 
 router = APIRouter()
@@ -12,17 +13,14 @@ async def create_anonymous_user():
     """创建匿名用户"""
     db = get_db()
     
-    # 创建匿名用户记录
-    user = User(
-        role="anonymous",
-        created_at=datetime.utcnow()
-    )
-    
-    result = await db.users.insert_one(user.dict(by_alias=True))
-    user.id = result.inserted_id
+    # 创建匿名用户记录（字段均由服务端生成，直接构建文档，无需经过User模型校验和序列化）
+    result = await db.users.insert_one({
+        "role": "anonymous",
+        "created_at": datetime.utcnow()
+    })
     
     return {
-        "user_id": str(user.id),
+        "user_id": str(result.inserted_id),
         "message": "匿名用户创建成功"
     }
 
@@ -31,11 +29,9 @@ async def get_anonymous_user(user_id: str):
     """获取匿名用户信息"""
     db = get_db()
     
-    try:
-        from bson import ObjectId
-        user_obj_id = ObjectId(user_id)
-    except:
+    if not ObjectId.is_valid(user_id):
         raise HTTPException(status_code=400, detail="无效的用户ID")
+    user_obj_id = ObjectId(user_id)
     
     user = await db.users.find_one({"_id": user_obj_id})
     if not user:
@@ -23,10 +23,10 @@ async def init_atlas_database():
     
     try:
         # Import MongoDB client
-        from motor.motor_asyncio import AsyncIOMotorClient
+        from pymongo import AsyncMongoClient
         
         # Create client with SSL configuration
-        client = AsyncIOMotorClient(mongo_url)
+        client = AsyncMongoClient(mongo_url)
         db = client.university_matcher
         
         # Test connection
@@ -53,47 +53,31 @@ async def init_atlas_database():
         print("3. Try running this from a different environment")
     finally:
         if 'client' in locals():
-            client.close()
+            await client.close()
 
 async def create_indexes(db):
-    """Create database indexes"""
-    try:
-        # Users collection
-        await db.users.create_index("created_at")
-        
-        # Universities collection
-        await db.universities.create_index("name")
-        await db.universities.create_index("country")
-        await db.universities.create_index("rank")
-        await db.universities.create_index([("country", 1), ("rank", 1)])
-        await db.universities.create_index("strengths")
-        await db.universities.create_index("tuition")
-        await db.universities.create_index("type")
-        await db.universities.create_index("schoolSize")
-        await db.universities.create_index("tags")
-        await db.universities.create_index("supports_ed")
-        await db.universities.create_index("supports_ea")
-        await db.universities.create_index("supports_rd")
-        await db.universities.create_index("internship_support_score")
-        await db.universities.create_index("acceptanceRate")
-        await db.universities.create_index("intlRate")
-        await db.universities.create_index("state")
-        await db.universities.create_index("personality_types")
-        
-        # Evaluations
-        await db.parent_evaluations.create_index("user_id")
-        await db.parent_evaluations.create_index("created_at")
-        await db.student_personality_tests.create_index("user_id")
-        await db.student_personality_tests.create_index("created_at")
-        
-    except Exception as e:
-        print(f"⚠️  Some indexes may already exist: {e}")
+    """Create database indexes (one create_indexes request per group, run concurrently; definitions in db/indexes.py)"""
+    from db.indexes import EVALUATION_INDEXES, UNIVERSITY_INDEXES, UNIVERSITY_NAME_INDEX, USER_INDEXES
+
+    groups = [
+        ("users", USER_INDEXES),
+        # name is unique (sample imports upsert by name); built on its own so duplicates don't block the rest
+        ("universities", [UNIVERSITY_NAME_INDEX]),
+        ("universities", UNIVERSITY_INDEXES),
+        ("parent_evaluations", EVALUATION_INDEXES),
+        ("student_personality_tests", EVALUATION_INDEXES),
+    ]
+
+    results = await asyncio.gather(
+        *(db[name].create_indexes(indexes) for name, indexes in groups),
+        return_exceptions=True,
+    )
+    for (name, _), result in zip(groups, results):
+        if isinstance(result, Exception):
+            print(f"⚠️  Some {name} indexes may already exist: {result}")
 
 async def import_sample_universities(db):
-    """Import sample university data"""
-    
-    # Clear existing data
-    await db.universities.delete_many({})
+    """Import sample university data (idempotent upsert by name, safe to re-run)"""
     
     # Sample universities data
     universities = [
@@ -180,9 +164,22 @@ async def import_sample_universities(db):
         }
     ]
     
-    # Insert universities
-    result = await db.universities.insert_many(universities)
-    print(f"✅ Inserted {len(result.inserted_ids)} universities")
+    # Upsert by name instead of delete + insert: unchanged documents cost no writes
+    # (unordered: one bad document does not stop the rest)
+    from pymongo import UpdateOne
+    from pymongo.errors import BulkWriteError
+    # name_lc backs the API's prefix search on name (same as the init_database importers)
+    ops = [
+        UpdateOne({"name": u["name"]}, {"$set": {**u, "name_lc": u["name"].lower()}}, upsert=True)
+        for u in universities
+    ]
+    try:
+        result = await db.universities.bulk_write(ops, ordered=False)
+        print(f"✅ Universities: {result.upserted_count} inserted, {result.modified_count} updated")
+    except BulkWriteError as e:
+        for error in e.details.get("writeErrors", []):
+            print(f"❌ Write failed: {error.get('errmsg')}")
+        print(f"✅ Universities: {e.details.get('nUpserted', 0)} inserted, {e.details.get('nModified', 0)} updated")
 
 if __name__ == "__main__":
     asyncio.run(init_atlas_database())
@@ -8,17 +8,50 @@ import os
 import sys
 import json
 import csv
+import importlib.util
+import hashlib
+from datetime import datetime
 from pathlib import Path
-from pymongo import MongoClient, ASCENDING, DESCENDING
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import bson
+import pymongo
+from pymongo import MongoClient, DESCENDING, InsertOne, UpdateOne, WriteConcern
+from pymongo.errors import BulkWriteError
 from dotenv import load_dotenv
 
+try:
+    # orjson解析大JSON文件比标准库快数倍；未安装时回退到json
+    import orjson
+except ImportError:
+    orjson = None
+
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from utils.parsing import parse_list_or_csv
+from db.indexes import (
+    EVALUATION_INDEXES, UNIVERSITY_INDEXES, UNIVERSITY_NAME_INDEX, USER_INDEXES, intl_indexes,
+)
+
 load_dotenv()
 
+# 导入时三个国际集合并发、每个集合再有IMPORT_WORKERS个写线程，连接池按此并发度预热，
+# 避免导入途中每个新线程各自建连（Atlas上TLS握手代价较高）；
+# 批量写入的文档字段名大量重复，开启线协议压缩（安装了zstandard时优先zstd，否则用内置zlib）
+CLIENT_OPTIONS = {
+    "maxPoolSize": 50,
+    "minPoolSize": 10,
+    "compressors": "zstd,zlib" if importlib.util.find_spec("zstandard") else "zlib",
+    "zlibCompressionLevel": 6,
+}
+
 def connect_database():
     """连接MongoDB数据库"""
+    # 批量导入的BSON编码依赖C扩展，纯Python回退实现会慢数倍
+    if not (pymongo.has_c() and bson.has_c()):
+        print("⚠️  警告: 未检测到pymongo/bson的C扩展，导入速度会明显变慢；请重新安装pymongo二进制包")
+    
     mongo_url = os.getenv("MONGO_URL", "mongodb://localhost:27017")
     
     if not mongo_url or mongo_url == "mongodb://localhost:27017":
@@ -55,7 +88,8 @@ def connect_database():
                 connectTimeoutMS=60000,  # 60秒连接超时
                 socketTimeoutMS=60000,  # 60秒socket超时
                 retryWrites=True,
-                retryReads=True
+                retryReads=True,
+                **CLIENT_OPTIONS
             )
             # 测试连接（带超时）
             print("   测试连接...")
@@ -74,7 +108,8 @@ def connect_database():
                     connectTimeoutMS=60000,
                     socketTimeoutMS=60000,
                     retryWrites=True,
-                    retryReads=True
+                    retryReads=True,
+                    **CLIENT_OPTIONS
                 )
                 client.admin.command('ping', maxTimeMS=10000)
                 print("   ✅ 替代连接方式成功！")
@@ -88,7 +123,8 @@ def connect_database():
         client = MongoClient(
             mongo_url,
             serverSelectionTimeoutMS=10000,
-            connectTimeoutMS=5000
+            connectTimeoutMS=5000,
+            **CLIENT_OPTIONS
         )
         try:
             client.admin.command('ping')
@@ -101,100 +137,110 @@ def connect_database():
     print(f"   📊 使用数据库: {db.name}")
     return db
 
-def create_indexes(db):
-    """创建数据库索引"""
-    print("创建数据库索引...")
-    
-    try:
-        # 用户集合索引
-        db.users.create_index("created_at")
-        print("✅ 用户索引创建完成")
-    except Exception as e:
-        print(f"⚠️  用户索引创建跳过: {e}")
-    
-    try:
-        # 大学集合索引 - 更新以支持新字段
-        # 先删除可能冲突的索引
+def _core_index_tasks(db):
+    """导入前必需的索引：各大学集合的名称唯一索引（upsert按name匹配）；
+    (说明, 集合, 索引列表)，每个集合单独一组，历史数据重名时不影响其它集合"""
+    return [
+        ("大学名称唯一索引", db.universities, [UNIVERSITY_NAME_INDEX]),
+        ("AU名称唯一索引", db.university_au, [UNIVERSITY_NAME_INDEX]),
+        ("UK名称唯一索引", db.university_uk, [UNIVERSITY_NAME_INDEX]),
+        ("SG名称唯一索引", db.university_sg, [UNIVERSITY_NAME_INDEX]),
+    ]
+
+def _secondary_index_tasks(db):
+    """查询用的二级索引（与应用启动时创建的相同，定义见db/indexes.py）：导入完成后再建，避免批量写入时逐条维护"""
+    return [
+        ("用户索引", db.users, USER_INDEXES),
+        ("大学索引", db.universities, UNIVERSITY_INDEXES),
+        ("家长评估索引", db.parent_evaluations, EVALUATION_INDEXES),
+        ("学生测试索引", db.student_personality_tests, EVALUATION_INDEXES),
+        ("AU索引", db.university_au, intl_indexes("university_au")),
+        ("UK索引", db.university_uk, intl_indexes("university_uk")),
+        ("SG索引", db.university_sg, intl_indexes("university_sg")),
+    ]
+
+def _run_index_tasks(tasks):
+    """每组一次create_indexes请求；pymongo客户端线程安全，各组DDL往返互相独立，并发执行"""
+    def run(task):
+        label, collection, indexes = task
         try:
-            db.universities.drop_index("name_1")
-            print("🔄 删除旧名称索引")
-        except:
-            pass
-        
-        # 创建新索引
-        db.universities.create_index("name", unique=True)  # 确保大学名称唯一
-        db.universities.create_index("country")
-        db.universities.create_index("rank")
-        db.universities.create_index([("country", ASCENDING), ("rank", ASCENDING)])
-        db.universities.create_index("strengths")
-        db.universities.create_index("tuition")
-        db.universities.create_index("type")
-        db.universities.create_index("school_size")
-        db.universities.create_index("tags")
-    
-        # 新增字段索引
-        db.universities.create_index("supports_ed")
-        db.universities.create_index("supports_ea")
-        db.universities.create_index("supports_rd")
-        db.universities.create_index("internship_support_score")
-        db.universities.create_index("acceptanceRate")
-        db.universities.create_index("intlRate")
-        db.universities.create_index("state")
-        db.universities.create_index("personality_types")
-        
-        print("✅ 大学索引创建完成")
-    except Exception as e:
-        print(f"⚠️  大学索引创建跳过: {e}")
+            collection.create_indexes(indexes)
+            print(f"✅ {label}创建完成")
+        except Exception as e:
+            print(f"⚠️  {label}创建跳过: {e}")
+    
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        list(executor.map(run, tasks))
+
+def create_core_indexes(db):
+    """创建导入前必需的名称唯一索引"""
+    print("创建名称唯一索引...")
     
+    # 大学集合索引 - 先删除可能冲突的索引
     try:
-        # 评估结果索引
-        db.parent_evaluations.create_index("user_id")
-        db.parent_evaluations.create_index("created_at")
-        db.student_personality_tests.create_index("user_id")
-        db.student_personality_tests.create_index("created_at")
-        print("✅ 评估索引创建完成")
-    except Exception as e:
-        print(f"⚠️  评估索引创建跳过: {e}")
+        db.universities.drop_index("name_1")
+        print("🔄 删除旧名称索引")
+    except:
+        pass
     
+    _run_index_tasks(_core_index_tasks(db))
+
+def create_secondary_indexes(db):
+    """导入完成后一次性构建二级索引（按已有数据排序建索引，比导入时逐条维护快得多）"""
+    print("创建二级索引...")
+    _run_index_tasks(_secondary_index_tasks(db))
     print("索引创建完成")
 
-    # 国际大学集合索引
-    try:
-        # AU
-        db.university_au.create_index("name", unique=True)
-        db.university_au.create_index("city")
-        db.university_au.create_index("rank")
-        db.university_au.create_index("work_integrated_learning")
-        db.university_au.create_index("group_of_eight")
-        db.university_au.create_index("strengths")
-        db.university_au.create_index("tags")
-        # UK
-        db.university_uk.create_index("name", unique=True)
-        db.university_uk.create_index("city")
-        db.university_uk.create_index("rank")
-        db.university_uk.create_index("foundation_available")
-        db.university_uk.create_index("placement_year_available")
-        db.university_uk.create_index("russell_group")
-        db.university_uk.create_index("strengths")
-        db.university_uk.create_index("tags")
-        # SG
-        db.university_sg.create_index("name", unique=True)
-        db.university_sg.create_index("rank")
-        db.university_sg.create_index("tuition_grant_available")
-        db.university_sg.create_index("strengths")
-        db.university_sg.create_index("tags")
-        print("✅ 国际大学索引创建完成")
-    except Exception as e:
-        print(f"⚠️  国际大学索引创建跳过: {e}")
+def create_indexes(db):
+    """创建全部数据库索引"""
+    create_core_indexes(db)
+    create_secondary_indexes(db)
+
+def reset_collection(collection):
+    """清空集合用于全量重新导入：直接drop（连同全部索引，比delete_many逐条删除快），
+    只重建名称唯一索引；二级索引由导入结束后的create_secondary_indexes统一重建"""
+    collection.drop()
+    collection.create_indexes([UNIVERSITY_NAME_INDEX])
+
+IMPORT_STATE_COLLECTION = "import_state"
+
+def _file_digest(path):
+    """计算数据文件内容的摘要，用于判断文件自上次导入后是否变化"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _is_unchanged(db, path, digest):
+    """文件摘要与上次成功导入时记录的一致"""
+    state = db[IMPORT_STATE_COLLECTION].find_one({"_id": Path(path).name}, {"digest": 1})
+    return state is not None and state.get("digest") == digest
+
+def _mark_imported(db, path, digest):
+    """导入成功后记录文件摘要"""
+    db[IMPORT_STATE_COLLECTION].replace_one(
+        {"_id": Path(path).name},
+        {"digest": digest, "imported_at": datetime.utcnow()},
+        upsert=True,
+    )
+
+def confirm_import(db, path, question):
+    """询问是否导入；文件自上次导入后未变化时默认跳过。返回(是否导入, 文件摘要)"""
+    digest = _file_digest(path)
+    if _is_unchanged(db, path, digest):
+        print(f"ℹ️  {Path(path).name} 自上次导入后未变化")
+        choice = input(f"{question}(y/n，默认n): ").strip().lower()
+        return choice == 'y', digest
+    choice = input(f"{question}(y/n，默认y): ").strip().lower()
+    return choice != 'n', digest
+
+_TRUE_VALUES = frozenset({'TRUE', 'T', 'YES', 'Y', '1'})
 
 def clean_boolean_value(value):
-    """清理布尔值"""
+    """清理布尔值（无法识别的值一律视为False）"""
     if isinstance(value, str):
-        value = value.strip().upper()
-        if value in ['TRUE', 'T', 'YES', 'Y', '1']:
-            return True
-        elif value in ['FALSE', 'F', 'NO', 'N', '0']:
-            return False
+        return value.strip().upper() in _TRUE_VALUES
     return False
 
 def clean_numeric_value(value, default=0, is_float=False):
@@ -202,6 +248,10 @@ def clean_numeric_value(value, default=0, is_float=False):
     if not value or value == '':
         return default
     
+    # 最常见的纯数字字符串直接转换，不走异常处理路径
+    if not is_float and type(value) is str and value.isdecimal():
+        return int(value)
+    
     try:
         if is_float:
             return float(value)
@@ -210,6 +260,143 @@ def clean_numeric_value(value, default=0, is_float=False):
     except (ValueError, TypeError):
         return default
 
+# 每批写入条数，可通过环境变量调整
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+IMPORT_WORKERS = 4
+# 导入写入只等主节点确认、不等journal落盘：导入可重复执行（按name幂等upsert），中途崩溃重跑即可
+IMPORT_WRITE_CONCERN = WriteConcern(w=1, j=False)
+# 最后一批用多数派+journal确认：journal和oplog都按顺序提交，最后一批落盘即代表之前各批也已持久化
+FINAL_WRITE_CONCERN = WriteConcern(w="majority", j=True)
+
+def bulk_upsert_by_name(collection, docs, insert_only=False):
+    """按name批量upsert：每IMPORT_CHUNK_SIZE条一次bulk_write，代替逐条find_one+update/insert；
+    docs可以是生成器（边读边写，内存占用与数据量无关），ordered=False时单条失败不影响其余写入；
+    各批次由IMPORT_WORKERS个线程并发写入（MongoClient线程安全，网络I/O期间释放GIL），
+    同时在途的批次数有上限，避免解析快于写入时积压；缺少name的记录跳过。
+    insert_only=True用于刚清空的集合：直接插入，省去服务端按name匹配（重名记录由唯一索引拒绝并报错）。
+    返回(新增数, 更新数)"""
+    inserted, updated = 0, 0
+    ops = []
+    held = None  # 暂留的最新一批，等其余批次全部完成后以FINAL_WRITE_CONCERN写入
+    pending = deque()
+    fast_collection = collection.with_options(write_concern=IMPORT_WRITE_CONCERN)
+    final_collection = collection.with_options(write_concern=FINAL_WRITE_CONCERN)
+    
+    def flush(batch, target=fast_collection):
+        try:
+            result = target.bulk_write(batch, ordered=False)
+            return result.inserted_count + result.upserted_count, result.matched_count
+        except BulkWriteError as e:
+            details = e.details
+            for error in details.get("writeErrors", []):
+                print(f"❌ 写入失败: {error.get('errmsg')}")
+            return details.get("nInserted", 0) + details.get("nUpserted", 0), details.get("nMatched", 0)
+    
+    with ThreadPoolExecutor(max_workers=IMPORT_WORKERS) as executor:
+        def collect(future):
+            nonlocal inserted, updated
+            n_inserted, n_updated = future.result()
+            inserted += n_inserted
+            updated += n_updated
+        
+        for doc in docs:
+            if not doc.get("name"):
+                continue
+            if insert_only:
+                ops.append(InsertOne(doc))
+            else:
+                ops.append(UpdateOne({"name": doc["name"]}, {"$set": doc}, upsert=True))
+            if len(ops) >= IMPORT_CHUNK_SIZE:
+                if held is not None:
+                    pending.append(executor.submit(flush, held))
+                held, ops = ops, []
+                if len(pending) >= IMPORT_WORKERS * 2:
+                    collect(pending.popleft())
+        if ops:
+            if held is not None:
+                pending.append(executor.submit(flush, held))
+            held = ops
+        while pending:
+            collect(pending.popleft())
+        if held is not None:
+            collect(executor.submit(flush, held, final_collection))
+    return inserted, updated
+
+# schools.csv字段清洗规则表：按类型分组逐字段处理，代替逐行展开的大字典字面量
+_CSV_STR_FIELDS = (
+    ("country", ""), ("state", ""), ("type", "private"), ("schoolSize", "medium"),
+    ("gptSummary", ""), ("satRange", ""), ("actRange", ""), ("gpaRange", ""),
+    ("applicationDeadline", ""), ("website", ""),
+)
+_CSV_INT_FIELDS = (("rank", 999), ("tuition", 0), ("internship_support_score", 5))
+_CSV_FLOAT_FIELDS = (("intlRate", 0), ("acceptanceRate", 0))
+_CSV_BOOL_FIELDS = ("supports_ed", "supports_ea", "supports_rd", "has_internship_program", "has_research_program")
+_CSV_LIST_FIELDS = ("strengths", "personality_types", "tags")
+
+# 设置IMPORT_DEBUG=true时打印前3行的原始值和清洗结果
+IMPORT_DEBUG = os.getenv("IMPORT_DEBUG", "false").lower() == "true"
+
+def _make_csv_row_cleaner(header):
+    """按表头把各字段名一次性解析为列下标，返回 行(list) -> 大学文档 的清洗函数；
+    缺列或短行对应的值视为None（与DictReader的行为一致）"""
+    index = {name: i for i, name in enumerate(header)}
+    name_col = index.get("name", -1)
+    str_cols = tuple((key, index.get(key, -1), default) for key, default in _CSV_STR_FIELDS)
+    int_cols = tuple((key, index.get(key, -1), default) for key, default in _CSV_INT_FIELDS)
+    float_cols = tuple((key, index.get(key, -1), default) for key, default in _CSV_FLOAT_FIELDS)
+    bool_cols = tuple((key, index.get(key, -1)) for key in _CSV_BOOL_FIELDS)
+    list_cols = tuple((key, index.get(key, -1)) for key in _CSV_LIST_FIELDS)
+    
+    def clean(row):
+        n = len(row)
+        name = row[name_col].strip() if 0 <= name_col < n else ""
+        university = {"name": name, "name_lc": name.lower(), "logoUrl": ""}
+        for key, col, default in str_cols:
+            university[key] = row[col].strip() if 0 <= col < n else default
+        for key, col, default in int_cols:
+            university[key] = clean_numeric_value(row[col] if 0 <= col < n else None, default)
+        for key, col, default in float_cols:
+            university[key] = clean_numeric_value(row[col] if 0 <= col < n else None, default, True)
+        for key, col in bool_cols:
+            university[key] = clean_boolean_value(row[col] if 0 <= col < n else None)
+        for key, col in list_cols:
+            university[key] = parse_list_or_csv(row[col] if 0 <= col < n else None)
+        return university
+    
+    return clean
+
+def _iter_clean_csv_rows(file):
+    """逐行读取schools.csv格式的CSV并清洗为大学文档（生成器），跳过缺少名称或格式错误的行；
+    用csv.reader按列下标取值，不为每行构建dict"""
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    clean = _make_csv_row_cleaner(header)
+    row_num = 0
+    for row in reader:
+        if not row:  # 跳过空行（与DictReader一致）
+            continue
+        row_num += 1
+        try:
+            university = clean(row)
+            
+            if IMPORT_DEBUG and row_num <= 3:
+                print(f"🔍 第{row_num}行原始数据: {dict(zip(header, row))}")
+                print(f"🔧 第{row_num}行清洗后数据: {university}")
+            
+            # 验证必需字段
+            if not university["name"]:
+                print(f"⚠️  第{row_num}行：缺少大学名称，跳过")
+                continue
+            
+            yield university
+            
+        except Exception as e:
+            print(f"❌ 第{row_num}行数据错误: {e}")
+            print(f"   行数据: {row}")
+            continue
+
 def import_universities_from_csv(db, csv_file_path, clear_existing=False):
     """从CSV文件导入大学数据"""
     if not os.path.exists(csv_file_path):
@@ -220,123 +407,12 @@ def import_universities_from_csv(db, csv_file_path, clear_existing=False):
     
     # 是否清空现有数据
     if clear_existing:
-        db.universities.delete_many({})
+        reset_collection(db.universities)
         print("已清空现有数据")
     
     with open(csv_file_path, 'r', encoding='utf-8') as file:
-        reader = csv.DictReader(file)
-        universities = []
-        updated_count = 0
-        inserted_count = 0
-        
-        for row_num, row in enumerate(reader, 1):
-            try:
-                # 调试：显示关键字段的原始值
-                if row_num <= 3:  # 只显示前3行
-                    print(f"🔍 第{row_num}行调试信息:")
-                    print(f"   acceptanceRate: '{row.get('acceptanceRate', 'NOT_FOUND')}'")
-                    print(f"   satRange: '{row.get('satRange', 'NOT_FOUND')}'")
-                    print(f"   actRange: '{row.get('actRange', 'NOT_FOUND')}'")
-                    print(f"   gpaRange: '{row.get('gpaRange', 'NOT_FOUND')}'")
-                    print(f"   applicationDeadline: '{row.get('applicationDeadline', 'NOT_FOUND')}'")
-                    print(f"   supports_ed: '{row.get('supports_ed', 'NOT_FOUND')}'")
-                    print(f"   supports_ea: '{row.get('supports_ea', 'NOT_FOUND')}'")
-                    print(f"   supports_rd: '{row.get('supports_rd', 'NOT_FOUND')}'")
-                    print(f"   has_internship_program: '{row.get('has_internship_program', 'NOT_FOUND')}'")
-                    print(f"   has_research_program: '{row.get('has_research_program', 'NOT_FOUND')}'")
-                    print(f"   internship_support_score: '{row.get('internship_support_score', 'NOT_FOUND')}'")
-                    print(f"   schoolSize: '{row.get('schoolSize', 'NOT_FOUND')}'")
-                    print(f"   website: '{row.get('website', 'NOT_FOUND')}'")
-                    print("   ---")
-                
-                # 数据清洗和转换 - 适配schools.csv格式
-                university = {
-                    "name": row.get("name", "").strip(),
-                    "country": row.get("country", "").strip(),
-                    "state": row.get("state", "").strip(),
-                    "rank": clean_numeric_value(row.get("rank"), 999),
-                    "tuition": clean_numeric_value(row.get("tuition"), 0),
-                    "intlRate": clean_numeric_value(row.get("intlRate"), 0, True),
-                    "type": row.get("type", "private").strip(),
-                    "schoolSize": row.get("schoolSize", "medium").strip(),
-                    "strengths": [s.strip() for s in row.get("strengths", "").split(",") if s.strip()] if row.get("strengths") else [],
-                    "gptSummary": row.get("gptSummary", "").strip(),
-                    "logoUrl": "",  # 暂时留空，后续可以添加
-                    "acceptanceRate": clean_numeric_value(row.get("acceptanceRate"), 0, True),
-                    "satRange": row.get("satRange", "").strip(),
-                    "actRange": row.get("actRange", "").strip(),
-                    "gpaRange": row.get("gpaRange", "").strip(),
-                    "applicationDeadline": row.get("applicationDeadline", "").strip(),
-                    "website": row.get("website", "").strip(),
-                    "supports_ed": clean_boolean_value(row.get("supports_ed")),
-                    "supports_ea": clean_boolean_value(row.get("supports_ea")),
-                    "supports_rd": clean_boolean_value(row.get("supports_rd")),
-                    "has_internship_program": clean_boolean_value(row.get("has_internship_program")),
-                    "has_research_program": clean_boolean_value(row.get("has_research_program")),
-                    "internship_support_score": clean_numeric_value(row.get("internship_support_score"), 5),
-                    "personality_types": [s.strip() for s in row.get("personality_types", "").split(",") if s.strip()] if row.get("personality_types") else [],
-                    "tags": [s.strip() for s in row.get("tags", "").split(",") if s.strip()] if row.get("tags") else []
-                }
-                
-                # 调试：显示清洗后的关键字段值
-                if row_num <= 3:  # 只显示前3行
-                    print(f"🔧 第{row_num}行清洗后数据:")
-                    print(f"   acceptanceRate: {university['acceptanceRate']}")
-                    print(f"   satRange: '{university['satRange']}'")
-                    print(f"   actRange: '{university['actRange']}'")
-                    print(f"   gpaRange: '{university['gpaRange']}'")
-                    print(f"   applicationDeadline: '{university['applicationDeadline']}'")
-                    print(f"   supports_ed: {university['supports_ed']}")
-                    print(f"   supports_ea: {university['supports_ea']}")
-                    print(f"   supports_rd: {university['supports_rd']}")
-                    print(f"   has_internship_program: {university['has_internship_program']}")
-                    print(f"   has_research_program: {university['has_research_program']}")
-                    print(f"   internship_support_score: {university['internship_support_score']}")
-                    print(f"   schoolSize: '{university['schoolSize']}'")
-                    print(f"   website: '{university['website']}'")
-                    print("   ---")
-                
-                # 验证必需字段
-                if not university["name"]:
-                    print(f"⚠️  第{row_num}行：缺少大学名称，跳过")
-                    continue
-                
-                # 检查是否已存在（按名称）
-                existing = db.universities.find_one({"name": university["name"]})
-                if existing:
-                    if clear_existing:
-                        # 如果清空模式，直接插入
-                        universities.append(university)
-                    else:
-                        # 更新模式，更新现有记录
-                        db.universities.update_one(
-                            {"name": university["name"]}, 
-                            {"$set": university}
-                        )
-                        updated_count += 1
-                else:
-                    universities.append(university)
-                
-            except Exception as e:
-                print(f"❌ 第{row_num}行数据错误: {e}")
-                print(f"   行数据: {row}")
-                continue
-        
-        # 批量插入新数据
-        if universities:
-            try:
-                result = db.universities.insert_many(universities)
-                inserted_count = len(result.inserted_ids)
-                print(f"✅ 成功插入 {inserted_count} 所新大学")
-            except Exception as e:
-                print(f"❌ 批量插入失败: {e}")
-                # 尝试逐个插入
-                for uni in universities:
-                    try:
-                        db.universities.insert_one(uni)
-                        inserted_count += 1
-                    except Exception as e2:
-                        print(f"❌ 插入失败 {uni['name']}: {e2}")
+        # 边读边清洗边分批upsert，内存占用与CSV大小无关
+        inserted_count, updated_count = bulk_upsert_by_name(db.universities, _iter_clean_csv_rows(file), insert_only=clear_existing)
         
         print(f"📊 导入完成：新增 {inserted_count} 所，更新 {updated_count} 所")
 
@@ -346,14 +422,23 @@ def _read_xlsx_rows(file_path, expected_headers):
         import openpyxl
     except Exception as e:
         raise RuntimeError("需要安装 openpyxl 以读取Excel文件: pip install openpyxl") from e
-    wb = openpyxl.load_workbook(file_path)
-    ws = wb.active
-    headers = [str(c.value).strip() if c.value is not None else "" for c in next(ws.iter_rows(min_row=1, max_row=1))[0:len(expected_headers)]]
-    if [h.strip() for h in headers] != expected_headers:
-        raise RuntimeError(f"Excel表头不匹配，期望: {expected_headers}，实际: {headers}")
-    for row in ws.iter_rows(min_row=2):
-        values = [c.value for c in row[:len(expected_headers)]]
-        yield dict(zip(expected_headers, values))
+    # 只读流式模式逐行返回原始值元组，不加载样式、不构建Cell对象；data_only读取公式的缓存结果
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        width = len(expected_headers)
+        header_row = next(ws.iter_rows(min_row=1, max_row=1, values_only=True))
+        headers = [str(v).strip() if v is not None else "" for v in header_row[:width]]
+        if headers != expected_headers:
+            raise RuntimeError(f"Excel表头不匹配，期望: {expected_headers}，实际: {headers}")
+        padding = (None,) * width
+        for values in ws.iter_rows(min_row=2, values_only=True):
+            # 只读模式下行尾空单元格会被截掉，补齐为None以保持字段完整
+            if len(values) < width:
+                values = (*values, *padding[len(values):])
+            yield dict(zip(expected_headers, values[:width]))
+    finally:
+        wb.close()
 
 
 def import_au_from_excel(db, file_path, clear_existing=False):
@@ -363,18 +448,14 @@ def import_au_from_excel(db, file_path, clear_existing=False):
         "placement_rate","post_study_visa_years","scholarship_available","strengths","tags","intlRate","website"
     ]
     if clear_existing:
-        db.university_au.delete_many({})
-    inserted, updated = 0, 0
-    for row in _read_xlsx_rows(file_path, expected):
-        row["strengths"] = [s.strip() for s in (row.get("strengths") or "").split(",") if s and str(s).strip()]
-        row["tags"] = [s.strip() for s in (row.get("tags") or "").split(",") if s and str(s).strip()]
-        existing = db.university_au.find_one({"name": row["name"]})
-        if existing and not clear_existing:
-            db.university_au.update_one({"_id": existing["_id"]}, {"$set": row})
-            updated += 1
-        else:
-            db.university_au.insert_one(row)
-            inserted += 1
+        reset_collection(db.university_au)
+    # 边读边写：行以生成器交给bulk_upsert_by_name分批写入，不在内存中攒整张表
+    def rows():
+        for row in _read_xlsx_rows(file_path, expected):
+            row["strengths"] = parse_list_or_csv(row.get("strengths"))
+            row["tags"] = parse_list_or_csv(row.get("tags"))
+            yield row
+    inserted, updated = bulk_upsert_by_name(db.university_au, rows(), insert_only=clear_existing)
     print(f"✅ AU 导入完成：新增 {inserted}，更新 {updated}")
 
 
@@ -386,22 +467,18 @@ def import_uk_from_excel(db, file_path, clear_existing=False):
         "tags","intlRate","website","scholarship_available"
     ]
     if clear_existing:
-        db.university_uk.delete_many({})
-    inserted, updated = 0, 0
-    for row in _read_xlsx_rows(file_path, expected):
-        # 跳过name为空或None的行
-        if not row.get("name") or not str(row.get("name", "")).strip():
-            continue
-        
-        row["strengths"] = [s.strip() for s in (row.get("strengths") or "").split(",") if s and str(s).strip()]
-        row["tags"] = [s.strip() for s in (row.get("tags") or "").split(",") if s and str(s).strip()]
-        existing = db.university_uk.find_one({"name": row["name"]})
-        if existing and not clear_existing:
-            db.university_uk.update_one({"_id": existing["_id"]}, {"$set": row})
-            updated += 1
-        else:
-            db.university_uk.insert_one(row)
-            inserted += 1
+        reset_collection(db.university_uk)
+    # 边读边写：行以生成器交给bulk_upsert_by_name分批写入，不在内存中攒整张表
+    def rows():
+        for row in _read_xlsx_rows(file_path, expected):
+            # 跳过name为空或None的行
+            if not row.get("name") or not str(row.get("name", "")).strip():
+                continue
+            
+            row["strengths"] = parse_list_or_csv(row.get("strengths"))
+            row["tags"] = parse_list_or_csv(row.get("tags"))
+            yield row
+    inserted, updated = bulk_upsert_by_name(db.university_uk, rows(), insert_only=clear_existing)
     print(f"✅ UK 导入完成：新增 {inserted}，更新 {updated}")
 
 
@@ -413,18 +490,14 @@ def import_sg_from_excel(db, file_path, clear_existing=False):
         "intlRate","website","scholarship_available"
     ]
     if clear_existing:
-        db.university_sg.delete_many({})
-    inserted, updated = 0, 0
-    for row in _read_xlsx_rows(file_path, expected):
-        row["strengths"] = [s.strip() for s in (row.get("strengths") or "").split(",") if s and str(s).strip()]
-        row["tags"] = [s.strip() for s in (row.get("tags") or "").split(",") if s and str(s).strip()]
-        existing = db.university_sg.find_one({"name": row["name"]})
-        if existing and not clear_existing:
-            db.university_sg.update_one({"_id": existing["_id"]}, {"$set": row})
-            updated += 1
-        else:
-            db.university_sg.insert_one(row)
-            inserted += 1
+        reset_collection(db.university_sg)
+    # 边读边写：行以生成器交给bulk_upsert_by_name分批写入，不在内存中攒整张表
+    def rows():
+        for row in _read_xlsx_rows(file_path, expected):
+            row["strengths"] = parse_list_or_csv(row.get("strengths"))
+            row["tags"] = parse_list_or_csv(row.get("tags"))
+            yield row
+    inserted, updated = bulk_upsert_by_name(db.university_sg, rows(), insert_only=clear_existing)
     print(f"✅ SG 导入完成：新增 {inserted}，更新 {updated}")
 
 def import_from_json(db, json_file_path, clear_existing=False):
@@ -436,11 +509,13 @@ def import_from_json(db, json_file_path, clear_existing=False):
     print(f"从JSON文件导入大学数据: {json_file_path}")
     
     try:
-        with open(json_file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
+        # 一次读入字节再解析（orjson只接受UTF-8字节，json.loads也能直接解析字节）
+        with open(json_file_path, 'rb') as file:
+            raw = file.read()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
         
         if clear_existing:
-            db.universities.delete_many({})
+            reset_collection(db.universities)
             print("已清空现有数据")
         
         if isinstance(data, list):
@@ -452,28 +527,10 @@ def import_from_json(db, json_file_path, clear_existing=False):
             return
         
         # 处理数据
-        inserted_count = 0
-        updated_count = 0
-        
         for uni in universities:
-            try:
-                # 检查是否已存在
-                existing = db.universities.find_one({"name": uni["name"]})
-                if existing:
-                    if clear_existing:
-                        db.universities.insert_one(uni)
-                        inserted_count += 1
-                    else:
-                        db.universities.update_one(
-                            {"name": uni["name"]}, 
-                            {"$set": uni}
-                        )
-                        updated_count += 1
-                else:
-                    db.universities.insert_one(uni)
-                    inserted_count += 1
-            except Exception as e:
-                print(f"❌ 处理大学 {uni.get('name', 'Unknown')} 失败: {e}")
+            if uni.get("name"):
+                uni["name_lc"] = uni["name"].lower()
+        inserted_count, updated_count = bulk_upsert_by_name(db.universities, universities, insert_only=clear_existing)
         
         print(f"📊 JSON导入完成：新增 {inserted_count} 所，更新 {updated_count} 所")
         
@@ -490,67 +547,88 @@ def export_to_csv(db, output_file="universities_export.csv"):
     
     output_path = data_dir / output_file
     
-    # 获取所有大学数据
-    universities = list(db.universities.find({}, {"_id": 0}).sort("rank", 1))
+    # 按批流式读取并逐行写出，内存中只保留一个批次
+    cursor = db.universities.find({}, {"_id": 0}).sort("rank", 1).batch_size(500)
+    first = next(cursor, None)
     
-    if not universities:
+    if first is None:
         print("❌ 数据库中没有大学数据")
         return
     
-    # 写入CSV
+    # 写入CSV（表头取自第一条记录，后续记录中多出的字段忽略）
     with open(output_path, 'w', encoding='utf-8', newline='') as file:
-        if universities:
-            fieldnames = universities[0].keys()
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(universities)
-    
-    print(f"✅ 成功导出 {len(universities)} 所大学到 {output_path}")
+        writer = csv.DictWriter(file, fieldnames=first.keys(), extrasaction='ignore')
+        writer.writeheader()
+        writer.writerow(first)
+        count = 1
+        for university in cursor:
+            writer.writerow(university)
+            count += 1
+    
+    print(f"✅ 成功导出 {count} 所大学到 {output_path}")
 
 def show_database_stats(db):
     """显示数据库统计信息"""
     print("\n📊 数据库统计信息:")
     print("-" * 40)
     
-    total_universities = db.universities.count_documents({})
+    def count_if(condition):
+        return {"$sum": {"$cond": [condition, 1, 0]}}
+    
+    def rank_lte(n):
+        # 聚合表达式中null/缺失值小于任何数字，先限定为数值，与查询{"rank": {"$lte": n}}一致
+        return {"$and": [{"$isNumber": "$rank"}, {"$lte": ["$rank", n]}]}
+    
+    # 一次$group遍历算出全部计数和平均学费，代替十余次count_documents往返
+    stats = next(db.universities.aggregate([
+        {"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "top10": count_if(rank_lte(10)),
+            "top20": count_if(rank_lte(20)),
+            "top50": count_if(rank_lte(50)),
+            "private": count_if({"$eq": ["$type", "private"]}),
+            "public": count_if({"$eq": ["$type", "public"]}),
+            "small": count_if({"$eq": ["$schoolSize", "small"]}),
+            "medium": count_if({"$eq": ["$schoolSize", "medium"]}),
+            "large": count_if({"$eq": ["$schoolSize", "large"]}),
+            "usa": count_if({"$eq": ["$country", "USA"]}),
+            "avg_tuition": {"$avg": "$tuition"},
+        }}
+    ]), None)
+    
+    total_universities = stats["total"] if stats else 0
     print(f"总大学数量: {total_universities}")
     
     if total_universities > 0:
         # 排名分布
-        top10 = db.universities.count_documents({"rank": {"$lte": 10}})
-        top20 = db.universities.count_documents({"rank": {"$lte": 20}})
-        top50 = db.universities.count_documents({"rank": {"$lte": 50}})
-        
-        print(f"前10名: {top10} 所")
-        print(f"前20名: {top20} 所")
-        print(f"前50名: {top50} 所")
+        print(f"前10名: {stats['top10']} 所")
+        print(f"前20名: {stats['top20']} 所")
+        print(f"前50名: {stats['top50']} 所")
         
         # 类型分布
-        private_count = db.universities.count_documents({"type": "private"})
-        public_count = db.universities.count_documents({"type": "public"})
-        print(f"私立大学: {private_count} 所")
-        print(f"公立大学: {public_count} 所")
+        print(f"私立大学: {stats['private']} 所")
+        print(f"公立大学: {stats['public']} 所")
         
         # 规模分布
-        small_count = db.universities.count_documents({"schoolSize": "small"})
-        medium_count = db.universities.count_documents({"schoolSize": "medium"})
-        large_count = db.universities.count_documents({"schoolSize": "large"})
-        print(f"小型学校: {small_count} 所")
-        print(f"中型学校: {medium_count} 所")
-        print(f"大型学校: {large_count} 所")
+        print(f"小型学校: {stats['small']} 所")
+        print(f"中型学校: {stats['medium']} 所")
+        print(f"大型学校: {stats['large']} 所")
         
         # 国家分布
-        usa_count = db.universities.count_documents({"country": "USA"})
-        print(f"美国大学: {usa_count} 所")
+        print(f"美国大学: {stats['usa']} 所")
         
         # 平均学费
-        avg_tuition = db.universities.aggregate([
-            {"$group": {"_id": None, "avg": {"$avg": "$tuition"}}}
-        ]).next()["avg"]
-        print(f"平均学费: ${avg_tuition:,.0f}")
+        print(f"平均学费: ${stats['avg_tuition'] or 0:,.0f}")
 
 def main():
     """主函数"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="大学数据库初始化与数据导入")
+    parser.add_argument("--generate-samples", action="store_true", help="国际数据Excel不存在时生成样例文件")
+    args = parser.parse_args()
+    
     print("🚀 大学数据库管理工具")
     print("=" * 50)
     
@@ -584,8 +662,8 @@ def main():
         print("   4. 确认 MongoDB 集群状态正常")
         return
     
-    # 创建索引
-    create_indexes(db)
+    # 导入前只建名称唯一索引，二级索引等全部导入结束后再建
+    create_core_indexes(db)
     
     # 检查数据文件（美国/默认）
     data_dir = Path(__file__).parent.parent / "data"
@@ -598,25 +676,28 @@ def main():
     
     if schools_csv.exists():
         print(f"📁 找到学校数据文件: {schools_csv}")
-        choice = input("是否从schools.csv导入数据？(y/n，默认y): ").strip().lower()
-        if choice != 'n':
+        choice, digest = confirm_import(db, schools_csv, "是否从schools.csv导入数据？")
+        if choice:
             clear_choice = input("是否清空现有数据？(y/n，默认n): ").strip().lower()
             clear_existing = clear_choice == 'y'
             import_universities_from_csv(db, str(schools_csv), clear_existing)
+            _mark_imported(db, schools_csv, digest)
     elif universities_csv.exists():
         print(f"📁 找到大学数据文件: {universities_csv}")
-        choice = input("是否从universities.csv导入数据？(y/n，默认y): ").strip().lower()
-        if choice != 'n':
+        choice, digest = confirm_import(db, universities_csv, "是否从universities.csv导入数据？")
+        if choice:
             clear_choice = input("是否清空现有数据？(y/n，默认n): ").strip().lower()
             clear_existing = clear_choice == 'y'
             import_universities_from_csv(db, str(universities_csv), clear_existing)
+            _mark_imported(db, universities_csv, digest)
     elif json_file.exists():
         print(f"📁 找到JSON文件: {json_file}")
-        choice = input("是否从JSON导入数据？(y/n，默认y): ").strip().lower()
-        if choice != 'n':
+        choice, digest = confirm_import(db, json_file, "是否从JSON导入数据？")
+        if choice:
             clear_choice = input("是否清空现有数据？(y/n，默认n): ").strip().lower()
             clear_existing = clear_choice == 'y'
             import_from_json(db, str(json_file), clear_existing)
+            _mark_imported(db, json_file, digest)
     # 国际数据（AU/UK/SG） - 优先读取Excel
     intl_dir = data_dir / "international"
     intl_dir.mkdir(exist_ok=True)
@@ -625,13 +706,13 @@ def main():
     uk_xlsx = intl_dir / "UK.xlsx"
     sg_xlsx = intl_dir / "SINGAPORE.xlsx"
 
-    # 如无Excel，尝试使用已有CSV结构生成Excel样例
+    # 如无Excel，按导入表头生成Excel样例（仅在--generate-samples时执行）
     def ensure_sample_excels():
         try:
             import openpyxl
         except Exception:
             print("⚠️ 未安装openpyxl，跳过生成Excel样例。可安装后重试: pip install openpyxl")
-        return
+            return
         if not au_xlsx.exists():
             wb = openpyxl.Workbook(); ws = wb.active
             ws.append(["name","country","city","rank","tuition_local","currency","tuition_usd","study_length_years","intakes","english_requirements","requires_english_test","group_of_eight","work_integrated_learning","placement_rate","post_study_visa_years","scholarship_available","strengths","tags","intlRate","website"])
@@ -651,23 +732,35 @@ def main():
             wb.save(sg_xlsx)
             print(f"🧪 已生成样例: {sg_xlsx}")
 
-    ensure_sample_excels()
+    if args.generate_samples:
+        ensure_sample_excels()
 
+    # 先逐个确认，再把选中的导入并发执行（三个集合互不相关，耗时取最慢的一个）
+    intl_imports = []
     if au_xlsx.exists():
-        choice = input("是否导入澳大利亚数据（AUSTRALIA.xlsx）？(y/n，默认y): ").strip().lower()
-        if choice != 'n':
+        choice, digest = confirm_import(db, au_xlsx, "是否导入澳大利亚数据（AUSTRALIA.xlsx）？")
+        if choice:
             clear_choice = input("是否清空AU现有数据？(y/n，默认n): ").strip().lower()
-            import_au_from_excel(db, str(au_xlsx), clear_choice == 'y')
+            intl_imports.append((import_au_from_excel, str(au_xlsx), clear_choice == 'y', digest))
     if uk_xlsx.exists():
-        choice = input("是否导入英国数据（UK.xlsx）？(y/n，默认y): ").strip().lower()
-        if choice != 'n':
+        choice, digest = confirm_import(db, uk_xlsx, "是否导入英国数据（UK.xlsx）？")
+        if choice:
             clear_choice = input("是否清空UK现有数据？(y/n，默认n): ").strip().lower()
-            import_uk_from_excel(db, str(uk_xlsx), clear_choice == 'y')
+            intl_imports.append((import_uk_from_excel, str(uk_xlsx), clear_choice == 'y', digest))
     if sg_xlsx.exists():
-        choice = input("是否导入新加坡数据（SINGAPORE.xlsx）？(y/n，默认y): ").strip().lower()
-        if choice != 'n':
+        choice, digest = confirm_import(db, sg_xlsx, "是否导入新加坡数据（SINGAPORE.xlsx）？")
+        if choice:
             clear_choice = input("是否清空SG现有数据？(y/n，默认n): ").strip().lower()
-            import_sg_from_excel(db, str(sg_xlsx), clear_choice == 'y')
+            intl_imports.append((import_sg_from_excel, str(sg_xlsx), clear_choice == 'y', digest))
+    
+    if intl_imports:
+        with ThreadPoolExecutor(max_workers=len(intl_imports)) as executor:
+            list(executor.map(lambda task: task[0](db, task[1], task[2]), intl_imports))
+        for _, path, _, digest in intl_imports:
+            _mark_imported(db, path, digest)
+    
+    # 全部导入结束后一次性构建二级索引
+    create_secondary_indexes(db)
     
     # 显示统计信息（仅美国数据集合）
     try:
@@ -47,20 +47,20 @@ def test_mongodb_connection(mongo_url):
     print(f"\n🔗 测试 MongoDB 连接...")
     print(f"   URL: {mongo_url[:60]}...")
     
-    # 提取主机名
-    if "mongodb+srv://" in mongo_url:
-        hostname = mongo_url.split("@")[1].split("/")[0]
+    # 提取主机名；mongodb+srv的主机名是SRV记录名（通常没有A记录），由驱动在连接时解析，
+    # 不再单独gethostbyname，连接成功后直接显示驱动解析出的节点
+    is_srv = "mongodb+srv://" in mongo_url
+    host_part = mongo_url.split("://", 1)[-1].split("@")[-1].split("/")[0]
+    if is_srv:
+        print(f"   SRV记录: {host_part}")
     elif "mongodb://" in mongo_url:
-        hostname = mongo_url.split("@")[1].split("/")[0].split(":")[0]
-    else:
-        hostname = None
-    
-    if hostname:
+        hostname = host_part.split(",")[0].split(":")[0]
         print(f"   主机名: {hostname}")
         test_dns_resolution(hostname)
     
     # 测试连接（短超时）
     print(f"\n   尝试连接（10秒超时）...")
+    client = None
     try:
         client = MongoClient(
             mongo_url,
@@ -72,6 +72,9 @@ def test_mongodb_connection(mongo_url):
         client.admin.command('ping')
         elapsed = time.time() - start_time
         print(f"   ✅ 连接成功！耗时: {elapsed:.2f}秒")
+        if is_srv:
+            nodes = ", ".join(f"{host}:{port}" for host, port in sorted(client.nodes))
+            print(f"   已解析节点: {nodes}")
         return True
     except ServerSelectionTimeoutError as e:
         print(f"   ❌ 连接超时: {e}")
@@ -88,10 +91,8 @@ def test_mongodb_connection(mongo_url):
         print(f"   ❌ 连接失败: {type(e).__name__}: {e}")
         return False
     finally:
-        try:
+        if client is not None:
             client.close()
-        except:
-            pass
 
 def main():
     print("=" * 60)
@@ -11,6 +11,9 @@
 
 import os
 import sys
+import io
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # 添加项目根目录到Python路径
@@ -23,26 +26,162 @@ except ImportError:
     sys.exit(1)
 
 
-def validate_au_data(file_path):
-    """验证澳大利亚数据"""
-    print(f"\n📋 验证澳大利亚数据: {file_path}")
-    
-    expected_headers = [
-        "name", "country", "city", "rank", "tuition_local", "currency", "tuition_usd",
-        "study_length_years", "intakes", "english_requirements", "requires_english_test",
-        "group_of_eight", "work_integrated_learning", "placement_rate", "post_study_visa_years",
-        "scholarship_available", "strengths", "tags", "intlRate", "website"
-    ]
+# 单个文件的错误数达到上限后停止检查（汇总只显示前5个错误，其余只影响计数）
+MAX_ERRORS = 50
+
+# 布尔字段允许的取值（True/False与1/0相等，集合中实际只有6个元素）
+_BOOL_OK = frozenset({True, False, "TRUE", "FALSE", "true", "false", 1, 0})
+
+
+def _as_int(value):
+    """openpyxl已将数值单元格解析为int时直接返回，其余（浮点、字符串）再转换；无法转换时抛出ValueError/TypeError"""
+    if type(value) is int:
+        return value
+    return int(value)
+
+
+def _as_float(value):
+    """同_as_int，浮点单元格直接返回"""
+    if type(value) is float:
+        return value
+    return float(value)
+
+
+def _iter_sheet_rows(file_path, width):
+    """以只读模式逐行读取首个工作表，直接返回单元格值元组（不创建Cell对象），读完关闭文件。
+    表头行完整读取以便检查列数；数据行只读到表头宽度（max_col），多余列不再解析，行尾空单元格补为None"""
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.active
+        yield from ws.iter_rows(max_row=1, values_only=True)
+        yield from ws.iter_rows(min_row=2, max_col=width, values_only=True)
+    finally:
+        wb.close()
+
+
+def _check_positive_int(value, row_idx, field, errors, warnings):
+    """必填正整数"""
+    try:
+        number = _as_int(value) if value else None
+        if number is None or number <= 0:
+            errors.append(f"❌ 第{row_idx}行: {field} 必须是正整数")
+    except (ValueError, TypeError):
+        errors.append(f"❌ 第{row_idx}行: {field} 格式错误 ({value})")
+
+
+def _check_bool(value, row_idx, field, errors, warnings):
+    """布尔字段"""
+    if value not in _BOOL_OK:
+        errors.append(f"❌ 第{row_idx}行: {field} 必须是 TRUE/FALSE，当前值: {value}")
+
+
+def _check_score(value, row_idx, field, errors, warnings):
+    """必填 1-10 评分"""
+    try:
+        score = _as_int(value) if value is not None else None
+        if score is None or score < 1 or score > 10:
+            errors.append(f"❌ 第{row_idx}行: {field} 必须是 1-10 的整数，当前值: {score}")
+    except (ValueError, TypeError):
+        errors.append(f"❌ 第{row_idx}行: {field} 格式错误 ({value})")
+
+
+def _check_optional_score(value, row_idx, field, errors, warnings):
+    """可选 1-10 评分，只给出警告"""
+    if value is None:
+        return
+    try:
+        score = _as_int(value)
+        if score < 1 or score > 10:
+            warnings.append(f"⚠️  第{row_idx}行: {field} 建议在 1-10 之间，当前值: {score}")
+    except (ValueError, TypeError):
+        warnings.append(f"⚠️  第{row_idx}行: {field} 格式可能有问题 ({value})")
+
+
+def _check_rate(value, row_idx, field, errors, warnings):
+    """可选比例（0-1），超出范围只给出警告"""
+    if value is None:
+        return
+    try:
+        rate = _as_float(value)
+        if rate < 0 or rate > 1:
+            warnings.append(f"⚠️  第{row_idx}行: {field} 应该在 0-1 之间，当前值: {rate}")
+    except (ValueError, TypeError):
+        errors.append(f"❌ 第{row_idx}行: {field} 格式错误 ({value})")
+
+
+# 各国数据表结构：表头顺序 + 按输出顺序排列的字段检查（name必填由validate_sheet统一检查）
+SCHEMAS = {
+    "AU": {
+        "label": "澳大利亚数据",
+        "headers": (
+            "name", "country", "city", "rank", "tuition_local", "currency", "tuition_usd",
+            "study_length_years", "intakes", "english_requirements", "requires_english_test",
+            "group_of_eight", "work_integrated_learning", "placement_rate", "post_study_visa_years",
+            "scholarship_available", "strengths", "tags", "intlRate", "website"
+        ),
+        "checks": [
+            ("rank", _check_positive_int),
+            ("tuition_local", _check_positive_int),
+            ("requires_english_test", _check_bool),
+            ("group_of_eight", _check_bool),
+            ("work_integrated_learning", _check_bool),
+            ("scholarship_available", _check_bool),
+            ("intlRate", _check_rate),
+        ],
+    },
+    "UK": {
+        "label": "英国数据",
+        "headers": (
+            "name", "country", "city", "rank", "tuition_local", "currency", "tuition_usd",
+            "study_length_years", "ucas_deadline_type", "typical_offer_alevel", "typical_offer_ib",
+            "foundation_available", "russell_group", "placement_year_available", "interview_required",
+            "admissions_tests", "personal_statement_weight", "strengths", "tags", "intlRate",
+            "website", "scholarship_available"
+        ),
+        "checks": [
+            ("foundation_available", _check_bool),
+            ("russell_group", _check_bool),
+            ("placement_year_available", _check_bool),
+            ("interview_required", _check_bool),
+            ("scholarship_available", _check_bool),
+            ("personal_statement_weight", _check_score),
+        ],
+    },
+    "SG": {
+        "label": "新加坡数据",
+        "headers": (
+            "name", "country", "city", "rank", "tuition_local", "currency", "tuition_usd",
+            "study_length_years", "tuition_grant_available", "tuition_grant_bond_years",
+            "interview_required", "essay_or_portfolio_required", "coop_or_internship_required",
+            "industry_links_score", "exchange_opportunities_score", "strengths", "tags",
+            "intlRate", "website", "scholarship_available"
+        ),
+        "checks": [
+            ("tuition_grant_available", _check_bool),
+            ("interview_required", _check_bool),
+            ("essay_or_portfolio_required", _check_bool),
+            ("coop_or_internship_required", _check_bool),
+            ("scholarship_available", _check_bool),
+            ("industry_links_score", _check_score),
+            ("exchange_opportunities_score", _check_optional_score),
+        ],
+    },
+}
+
+
+def validate_sheet(file_path, schema, max_errors=MAX_ERRORS):
+    """按数据表结构验证Excel文件，返回(errors, warnings)；错误数达到max_errors时提前结束"""
+    print(f"\n📋 验证{schema['label']}: {file_path}")
     
+    expected_headers = schema["headers"]
     errors = []
     warnings = []
     
     try:
-        wb = openpyxl.load_workbook(file_path)
-        ws = wb.active
+        rows = _iter_sheet_rows(file_path, len(expected_headers))
         
         # 检查表头
-        headers = [cell.value for cell in ws[1]]
+        headers = next(rows, ())
         if headers != expected_headers:
             errors.append(f"❌ 表头不匹配！期望 {len(expected_headers)} 列，实际 {len(headers)} 列")
             errors.append(f"   期望: {', '.join(expected_headers)}")
@@ -51,54 +190,27 @@ def validate_au_data(file_path):
         
         print(f"✅ 表头正确（共 {len(expected_headers)} 列）")
         
+        # 字段名换算成列号（循环外只做一次）
+        checks = [(expected_headers.index(field), field, check) for field, check in schema["checks"]]
+        
         # 验证数据行
         data_rows = 0
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=False), start=2):
-            if not any(cell.value for cell in row):
+        for row_idx, row_values in enumerate(rows, start=2):
+            if not any(row_values):
                 continue  # 跳过空行
             
             data_rows += 1
-            row_values = [cell.value for cell in row]
             
             # 检查必填字段
             if not row_values[0]:  # name
                 errors.append(f"❌ 第{row_idx}行: name 不能为空")
             
-            # 检查数字字段
-            try:
-                rank = int(row_values[3]) if row_values[3] else None
-                if rank is None or rank <= 0:
-                    errors.append(f"❌ 第{row_idx}行: rank 必须是正整数")
-            except (ValueError, TypeError):
-                errors.append(f"❌ 第{row_idx}行: rank 格式错误 ({row_values[3]})")
+            for col_idx, field, check in checks:
+                check(row_values[col_idx], row_idx, field, errors, warnings)
             
-            try:
-                tuition_local = int(row_values[4]) if row_values[4] else None
-                if tuition_local is None or tuition_local <= 0:
-                    errors.append(f"❌ 第{row_idx}行: tuition_local 必须是正整数")
-            except (ValueError, TypeError):
-                errors.append(f"❌ 第{row_idx}行: tuition_local 格式错误 ({row_values[4]})")
-            
-            # 检查布尔字段
-            bool_fields = {
-                10: "requires_english_test",
-                11: "group_of_eight",
-                12: "work_integrated_learning",
-                15: "scholarship_available"
-            }
-            for col_idx, field_name in bool_fields.items():
-                value = row_values[col_idx]
-                if value not in [True, False, "TRUE", "FALSE", "true", "false", 1, 0]:
-                    errors.append(f"❌ 第{row_idx}行: {field_name} 必须是 TRUE/FALSE，当前值: {value}")
-            
-            # 检查浮点数字段
-            try:
-                intl_rate = float(row_values[18]) if row_values[18] is not None else None
-                if intl_rate is not None and (intl_rate < 0 or intl_rate > 1):
-                    warnings.append(f"⚠️  第{row_idx}行: intlRate 应该在 0-1 之间，当前值: {intl_rate}")
-            except (ValueError, TypeError):
-                if row_values[18] is not None:
-                    errors.append(f"❌ 第{row_idx}行: intlRate 格式错误 ({row_values[18]})")
+            if max_errors and len(errors) >= max_errors:
+                warnings.append(f"⚠️  错误已达 {max_errors} 个，第{row_idx}行之后的数据未检查")
+                break
         
         print(f"✅ 检查了 {data_rows} 行数据")
         
@@ -110,151 +222,28 @@ def validate_au_data(file_path):
     return errors, warnings
 
 
+def validate_au_data(file_path):
+    """验证澳大利亚数据"""
+    return validate_sheet(file_path, SCHEMAS["AU"])
+
+
 def validate_uk_data(file_path):
     """验证英国数据"""
-    print(f"\n📋 验证英国数据: {file_path}")
-    
-    expected_headers = [
-        "name", "country", "city", "rank", "tuition_local", "currency", "tuition_usd",
-        "study_length_years", "ucas_deadline_type", "typical_offer_alevel", "typical_offer_ib",
-        "foundation_available", "russell_group", "placement_year_available", "interview_required",
-        "admissions_tests", "personal_statement_weight", "strengths", "tags", "intlRate",
-        "website", "scholarship_available"
-    ]
-    
-    errors = []
-    warnings = []
-    
-    try:
-        wb = openpyxl.load_workbook(file_path)
-        ws = wb.active
-        
-        headers = [cell.value for cell in ws[1]]
-        if headers != expected_headers:
-            errors.append(f"❌ 表头不匹配！期望 {len(expected_headers)} 列，实际 {len(headers)} 列")
-            return errors, warnings
-        
-        print(f"✅ 表头正确（共 {len(expected_headers)} 列）")
-        
-        data_rows = 0
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=False), start=2):
-            if not any(cell.value for cell in row):
-                continue
-            
-            data_rows += 1
-            row_values = [cell.value for cell in row]
-            
-            if not row_values[0]:
-                errors.append(f"❌ 第{row_idx}行: name 不能为空")
-            
-            # 检查布尔字段
-            bool_fields = {
-                11: "foundation_available",
-                12: "russell_group",
-                13: "placement_year_available",
-                14: "interview_required",
-                21: "scholarship_available"
-            }
-            for col_idx, field_name in bool_fields.items():
-                value = row_values[col_idx]
-                if value not in [True, False, "TRUE", "FALSE", "true", "false", 1, 0]:
-                    errors.append(f"❌ 第{row_idx}行: {field_name} 必须是 TRUE/FALSE，当前值: {value}")
-            
-            # 检查 personal_statement_weight
-            try:
-                ps_weight = int(row_values[16]) if row_values[16] is not None else None
-                if ps_weight is None or ps_weight < 1 or ps_weight > 10:
-                    errors.append(f"❌ 第{row_idx}行: personal_statement_weight 必须是 1-10 的整数，当前值: {ps_weight}")
-            except (ValueError, TypeError):
-                if row_values[16] is not None:
-                    errors.append(f"❌ 第{row_idx}行: personal_statement_weight 格式错误 ({row_values[16]})")
-        
-        print(f"✅ 检查了 {data_rows} 行数据")
-        
-    except FileNotFoundError:
-        errors.append(f"❌ 文件不存在: {file_path}")
-    except Exception as e:
-        errors.append(f"❌ 读取文件出错: {e}")
-    
-    return errors, warnings
+    return validate_sheet(file_path, SCHEMAS["UK"])
 
 
 def validate_sg_data(file_path):
     """验证新加坡数据"""
-    print(f"\n📋 验证新加坡数据: {file_path}")
-    
-    expected_headers = [
-        "name", "country", "city", "rank", "tuition_local", "currency", "tuition_usd",
-        "study_length_years", "tuition_grant_available", "tuition_grant_bond_years",
-        "interview_required", "essay_or_portfolio_required", "coop_or_internship_required",
-        "industry_links_score", "exchange_opportunities_score", "strengths", "tags",
-        "intlRate", "website", "scholarship_available"
-    ]
-    
-    errors = []
-    warnings = []
-    
-    try:
-        wb = openpyxl.load_workbook(file_path)
-        ws = wb.active
-        
-        headers = [cell.value for cell in ws[1]]
-        if headers != expected_headers:
-            errors.append(f"❌ 表头不匹配！期望 {len(expected_headers)} 列，实际 {len(headers)} 列")
-            return errors, warnings
-        
-        print(f"✅ 表头正确（共 {len(expected_headers)} 列）")
-        
-        data_rows = 0
-        for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=False), start=2):
-            if not any(cell.value for cell in row):
-                continue
-            
-            data_rows += 1
-            row_values = [cell.value for cell in row]
-            
-            if not row_values[0]:
-                errors.append(f"❌ 第{row_idx}行: name 不能为空")
-            
-            # 检查布尔字段
-            bool_fields = {
-                8: "tuition_grant_available",
-                10: "interview_required",
-                11: "essay_or_portfolio_required",
-                12: "coop_or_internship_required",
-                19: "scholarship_available"
-            }
-            for col_idx, field_name in bool_fields.items():
-                value = row_values[col_idx]
-                if value not in [True, False, "TRUE", "FALSE", "true", "false", 1, 0]:
-                    errors.append(f"❌ 第{row_idx}行: {field_name} 必须是 TRUE/FALSE，当前值: {value}")
-            
-            # 检查 industry_links_score
-            try:
-                score = int(row_values[13]) if row_values[13] is not None else None
-                if score is None or score < 1 or score > 10:
-                    errors.append(f"❌ 第{row_idx}行: industry_links_score 必须是 1-10 的整数，当前值: {score}")
-            except (ValueError, TypeError):
-                if row_values[13] is not None:
-                    errors.append(f"❌ 第{row_idx}行: industry_links_score 格式错误 ({row_values[13]})")
-            
-            # 检查 exchange_opportunities_score（可选）
-            if row_values[14] is not None:
-                try:
-                    ex_score = int(row_values[14])
-                    if ex_score < 1 or ex_score > 10:
-                        warnings.append(f"⚠️  第{row_idx}行: exchange_opportunities_score 建议在 1-10 之间，当前值: {ex_score}")
-                except (ValueError, TypeError):
-                    warnings.append(f"⚠️  第{row_idx}行: exchange_opportunities_score 格式可能有问题 ({row_values[14]})")
-        
-        print(f"✅ 检查了 {data_rows} 行数据")
-        
-    except FileNotFoundError:
-        errors.append(f"❌ 文件不存在: {file_path}")
-    except Exception as e:
-        errors.append(f"❌ 读取文件出错: {e}")
-    
-    return errors, warnings
+    return validate_sheet(file_path, SCHEMAS["SG"])
+
+
+def _run_validation(task):
+    """在子进程中执行单个验证函数，捕获其输出，由主进程按顺序打印，避免多个进程的日志交错"""
+    validate, file_path = task
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        errors, warnings = validate(file_path)
+    return buffer.getvalue(), errors, warnings
 
 
 def main():
@@ -268,22 +257,27 @@ def main():
     
     base_dir = Path(__file__).parent.parent / "data" / "international"
     
-    results = {}
-    
+    jobs = []
     if args.all or args.country == "AU":
-        au_file = base_dir / "AUSTRALIA.xlsx"
-        errors, warnings = validate_au_data(au_file)
-        results["Australia"] = (errors, warnings)
-    
+        jobs.append(("Australia", validate_au_data, base_dir / "AUSTRALIA.xlsx"))
     if args.all or args.country == "UK":
-        uk_file = base_dir / "UK.xlsx"
-        errors, warnings = validate_uk_data(uk_file)
-        results["United Kingdom"] = (errors, warnings)
-    
+        jobs.append(("United Kingdom", validate_uk_data, base_dir / "UK.xlsx"))
     if args.all or args.country == "SG":
-        sg_file = base_dir / "SINGAPORE.xlsx"
-        errors, warnings = validate_sg_data(sg_file)
-        results["Singapore"] = (errors, warnings)
+        jobs.append(("Singapore", validate_sg_data, base_dir / "SINGAPORE.xlsx"))
+    
+    # 多个国家时并行验证（解析xlsx是CPU密集型，用进程绕开GIL）
+    tasks = [(validate, file_path) for _, validate, file_path in jobs]
+    if len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=len(tasks)) as executor:
+            outcomes = list(executor.map(_run_validation, tasks))
+    else:
+        outcomes = [_run_validation(task) for task in tasks]
+    
+    # 按国家顺序输出各自的验证过程日志
+    results = {}
+    for (country, _, _), (log, errors, warnings) in zip(jobs, outcomes):
+        print(log, end="")
+        results[country] = (errors, warnings)
     
     # 汇总结果
     print("\n" + "="*60)
@@ -26,12 +26,15 @@ async def test_startup():
     # 2. Test MongoDB connection
     print("\n2️⃣ Testing MongoDB connection...")
     try:
-        from motor.motor_asyncio import AsyncIOMotorClient
+        from pymongo import AsyncMongoClient
         
-        client = AsyncIOMotorClient(mongo_url)
-        await client.admin.command('ping')
-        print("   ✅ MongoDB connection successful")
-        client.close()
+        # Fail fast on a bad URL instead of waiting for the 30 s default server selection
+        client = AsyncMongoClient(mongo_url, serverSelectionTimeoutMS=3000, connectTimeoutMS=3000)
+        try:
+            await client.admin.command('ping')
+            print("   ✅ MongoDB connection successful")
+        finally:
+            await client.close()
     except Exception as e:
         print(f"   ❌ MongoDB connection failed: {e}")
         print("   🔧 Please check your MongoDB Atlas connection string")
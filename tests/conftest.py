@@ -1,3 +1,9 @@
+import os
+
+# Must be set before db.mongo is imported: the app lifespan then installs the
+# in-memory MockDatabase instead of attempting a MongoDB (or SRV DNS) connection.
+os.environ.setdefault("MOCK_MODE", "true")
+
 import pytest
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
@@ -6,10 +12,15 @@ from unittest.mock import AsyncMock, patch
 
 from main import app
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def client():
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
+    """Create a test client for the FastAPI app, shared by the whole session.
+
+    The lifespan runs once; under MOCK_MODE it only installs the mock database.
+    Tests that need specific data still patch ``db.mongo.db``.
+    """
+    with TestClient(app) as test_client:
+        yield test_client
 
 @pytest.fixture
 async def async_client():
@@ -0,0 +1,51 @@
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from bson import ObjectId
+
+from db.mongo import MockDatabase
+
+
+def _evaluation(user_id, created_at):
+    return {
+        "_id": ObjectId(), "user_id": user_id, "input": {"target_country": "USA"},
+        "recommended_schools": [], "ea_suggestions": [], "rd_suggestions": [],
+        "gpt_summary": "", "created_at": created_at,
+    }
+
+
+@pytest.fixture
+def mock_db():
+    """Mock database holding five evaluations for one user, two of them created at the same instant."""
+    mock = MockDatabase()
+    times = [datetime(2024, 1, day, 12, 0, 0) for day in (1, 2, 3, 3, 4)]
+    mock.parent_evaluations.data = [_evaluation("u1", t) for t in times] + [_evaluation("u2", times[0])]
+    with patch("db.mongo.db", mock):
+        yield mock
+
+
+def test_parent_evaluations_cursor_reaches_full_history(client, mock_db):
+    """Keyset pages walk every evaluation newest first without gaps or repeats."""
+    seen = []
+    params = {"limit": 2}
+    while True:
+        response = client.get("/api/evals/parent/user/u1", params=params)
+        assert response.status_code == 200
+        seen += [e["id"] for e in response.json()]
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        params = {"limit": 2, "cursor": next_cursor}
+
+    expected = sorted(
+        (d for d in mock_db.parent_evaluations.data if d["user_id"] == "u1"),
+        key=lambda d: (d["created_at"], d["_id"]), reverse=True,
+    )
+    assert seen == [str(d["_id"]) for d in expected]
+
+
+def test_parent_evaluations_invalid_cursor(client, mock_db):
+    """Malformed cursors are rejected."""
+    response = client.get("/api/evals/parent/user/u1", params={"cursor": "abc"})
+    assert response.status_code == 400
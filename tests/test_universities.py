@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+from unittest.mock import patch
+from pymongo.errors import OperationFailure
+
+from db.mongo import MockDatabase
+from routes import universities
+
+
+@pytest.fixture
+def mock_db():
+    """Patch the global database with the in-memory mock database."""
+    mock = MockDatabase()
+    with patch("db.mongo.db", mock):
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def clear_list_caches():
+    """Reset the module-level list caches between tests."""
+    universities._countries_cache.clear()
+    universities._strengths_cache.clear()
+    universities._count_cache.clear()
+    yield
+    universities._countries_cache.clear()
+    universities._strengths_cache.clear()
+    universities._count_cache.clear()
+
+
+def test_countries_list_is_cached(client, mock_db):
+    """Repeated calls are served from the TTL cache."""
+    first = client.get("/api/universities/countries/list").json()
+    assert "USA" in first["countries"]
+
+    mock_db.universities.data.append({"_id": "mock_3", "name": "Toronto", "country": "Canada"})
+    second = client.get("/api/universities/countries/list").json()
+    assert second == first
+
+    universities._countries_cache.clear()
+    third = client.get("/api/universities/countries/list").json()
+    assert "Canada" in third["countries"]
+
+
+def test_strengths_list_cached_per_country(client, mock_db):
+    """Strengths are cached separately for each country filter."""
+    us = client.get("/api/universities/strengths/list").json()
+    au = client.get("/api/universities/strengths/list", params={"country": "Australia"}).json()
+    assert "business" in us["strengths"]
+    assert "Engineering" in au["strengths"]
+    assert us != au
+
+
+def test_search_uses_text_query(client, mock_db):
+    """Keyword search matches on name or strengths."""
+    response = client.get("/api/universities/", params={"search": "stanford"})
+    assert response.status_code == 200
+    assert [u["name"] for u in response.json()] == ["Stanford University"]
+
+    response = client.get("/api/universities/", params={"search": "law"})
+    assert [u["name"] for u in response.json()] == ["Harvard University"]
+
+
+def test_paginated_search_counts_without_text_in_aggregation(client, mock_db):
+    """Search totals never send $text nested in $or through an aggregation $match."""
+    search_filter = universities._build_search_filter("law")
+    with pytest.raises(OperationFailure):
+        asyncio.run(mock_db.universities.count_documents(search_filter))
+
+    body = client.get("/api/universities/paginated", params={"search": "law"}).json()
+    assert [u["name"] for u in body["universities"]] == ["Harvard University"]
+    assert body["total"] == 1
+
+
+def test_paginated_cursor_walks_all_pages(client, mock_db):
+    """Keyset cursor pages continue where the previous page ended."""
+    first = client.get("/api/universities/paginated", params={"page_size": 1}).json()
+    assert [u["name"] for u in first["universities"]] == ["Harvard University"]
+    assert first["total"] == 2
+    assert first["next_cursor"]
+
+    second = client.get(
+        "/api/universities/paginated",
+        params={"page_size": 1, "cursor": first["next_cursor"]},
+    ).json()
+    assert [u["name"] for u in second["universities"]] == ["Stanford University"]
+    assert second["total"] is None
+    assert second["has_next"] is False
+    assert second["next_cursor"] is None
+
+
+def test_paginated_invalid_cursor(client, mock_db):
+    """Malformed cursors are rejected."""
+    response = client.get("/api/universities/paginated", params={"cursor": "abc"})
+    assert response.status_code == 400
+
+
+def test_list_cursor_header(client, mock_db):
+    """The array endpoint exposes the keyset cursor in a response header."""
+    first = client.get("/api/universities/", params={"page_size": 1})
+    assert [u["name"] for u in first.json()] == ["Harvard University"]
+    next_cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get("/api/universities/", params={"page_size": 1, "cursor": next_cursor})
+    assert [u["name"] for u in second.json()] == ["Stanford University"]
+    assert "X-Next-Cursor" not in second.headers
+
+
+def test_paginated_total_is_cached(client, mock_db):
+    """The total for a filter is reused within the count cache TTL."""
+    first = client.get("/api/universities/paginated", params={"page_size": 1}).json()
+    assert first["total"] == 2
+
+    mock_db.universities.data.append({
+        "_id": "mock_3", "name": "Yale University", "country": "USA", "state": "Connecticut",
+        "rank": 3, "tuition": 60000, "intlRate": 0.1, "type": "private",
+        "strengths": ["law"], "gptSummary": "",
+    })
+    second = client.get("/api/universities/paginated", params={"page_size": 1, "page": 2}).json()
+    assert second["total"] == 2
+    assert [u["name"] for u in second["universities"]] == ["Stanford University"]
+
+    universities._count_cache.clear()
+    third = client.get("/api/universities/paginated", params={"page_size": 1}).json()
+    assert third["total"] == 3
+
+
+def test_list_etag_not_modified(client, mock_db):
+    """A matching If-None-Match short-circuits with 304 and no body."""
+    first = client.get("/api/universities/paginated", params={"page_size": 1})
+    etag = first.headers["ETag"]
+    assert "max-age" in first.headers["Cache-Control"]
+
+    second = client.get(
+        "/api/universities/paginated",
+        params={"page_size": 1},
+        headers={"If-None-Match": etag},
+    )
+    assert second.status_code == 304
+    assert second.content == b""
+
+    other = client.get(
+        "/api/universities/paginated",
+        params={"page_size": 2},
+        headers={"If-None-Match": etag},
+    )
+    assert other.status_code == 200
+
+
+def test_list_etag_tracks_body_and_skips_fallback(client, mock_db):
+    """The ETag follows the response body, and degraded results are never cached."""
+    first = client.get("/api/universities/", params={"page_size": 1})
+    etag = first.headers["ETag"]
+
+    mock_db.universities.data[0]["name"] = "Harvard College"
+    changed = client.get("/api/universities/", params={"page_size": 1}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+    def broken_find(*args, **kwargs):
+        raise RuntimeError("operation exceeded time limit")
+
+    mock_db.universities.find = broken_find
+    failed = client.get("/api/universities/", params={"page_size": 1})
+    assert failed.json() == []
+    assert "ETag" not in failed.headers
+    assert "Cache-Control" not in failed.headers
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from bson import ObjectId
+
+from db.mongo import MockDatabase
+from routes import universities_international
+
+
+def _sg_doc(_id, name, rank):
+    return {
+        "_id": _id, "name": name, "country": "Singapore", "city": "Singapore",
+        "rank": rank, "tuition_local": 30000, "currency": "SGD", "tuition_usd": 22000,
+        "study_length_years": 4.0, "tuition_grant_available": True,
+        "interview_required": False, "essay_or_portfolio_required": False,
+        "coop_or_internship_required": False, "industry_links_score": 8,
+        "strengths": "Engineering, Computer Science", "intlRate": 0.3,
+        "website": "https://example.edu.sg", "scholarship_available": True,
+    }
+
+
+@pytest.fixture
+def mock_db():
+    """Mock database whose SG collection holds complete documents."""
+    mock = MockDatabase()
+    mock.university_sg.data = [_sg_doc("sg_1", "NUS", 8), _sg_doc("sg_2", "NTU", 15)]
+    # The AU/UK sample documents lack required response fields
+    mock.university_au.data = []
+    mock.university_uk.data = []
+    with patch("db.mongo.db", mock):
+        yield mock
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Reset the module-level result caches between tests."""
+    universities_international._list_cache.clear()
+    universities_international._detail_cache.clear()
+    yield
+    universities_international._list_cache.clear()
+    universities_international._detail_cache.clear()
+
+
+def test_sg_list_cursor_and_cache(client, mock_db):
+    """Cursor pages follow rank order and repeat queries are served from cache."""
+    first = client.get("/api/international/sg", params={"page_size": 1})
+    assert [u["name"] for u in first.json()] == ["NUS"]
+    assert first.json()[0]["strengths"] == ["Engineering", "Computer Science"]
+    next_cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get("/api/international/sg", params={"page_size": 1, "cursor": next_cursor})
+    assert [u["name"] for u in second.json()] == ["NTU"]
+    assert "X-Next-Cursor" not in second.headers
+
+    mock_db.university_sg.data.clear()
+    cached = client.get("/api/international/sg", params={"page_size": 1})
+    assert cached.json() == first.json()
+    assert cached.headers["X-Next-Cursor"] == next_cursor
+
+
+def test_combined_lists_all_countries(client, mock_db):
+    """The combined endpoint returns each country's first page."""
+    response = client.get("/api/international/combined", params={"page_size": 1})
+    assert response.status_code == 200
+    body = response.json()
+    assert [u["name"] for u in body["sg"]] == ["NUS"]
+    assert body["au"] == [] and body["uk"] == []
+
+
+def test_sg_detail_cached_and_validated(client, mock_db):
+    """Detail lookups validate the id, 404 on misses and cache hits."""
+    oid = ObjectId()
+    mock_db.university_sg.data.append(_sg_doc(oid, "SMU", 40))
+
+    assert client.get("/api/international/sg/not-an-id").status_code == 400
+    assert client.get(f"/api/international/sg/{ObjectId()}").status_code == 404
+
+    first = client.get(f"/api/international/sg/{oid}")
+    assert first.status_code == 200
+    assert first.json()["id"] == str(oid)
+
+    mock_db.university_sg.data.clear()
+    assert client.get(f"/api/international/sg/{oid}").json() == first.json()
+
+
+def test_sg_list_cursor_with_float_rank(client, mock_db):
+    """Integral float ranks from imported data still produce a next cursor."""
+    mock_db.university_sg.data[1]["rank"] = 15.0
+    mock_db.university_sg.data.append(_sg_doc("sg_3", "SMU", 40))
+
+    first = client.get("/api/international/sg", params={"page_size": 2})
+    assert [u["name"] for u in first.json()] == ["NUS", "NTU"]
+    assert first.headers["X-Next-Cursor"] == "15_sg_2"
+
+    second = client.get("/api/international/sg", params={"page_size": 2, "cursor": first.headers["X-Next-Cursor"]})
+    assert [u["name"] for u in second.json()] == ["SMU"]
+
+
+def test_find_page_walks_missing_ranks(mock_db):
+    """Documents without a rank sort first and are paged through instead of ending pagination."""
+    collection = mock_db.university_sg
+    collection.data = [{"_id": "d", "rank": 3}, {"_id": "b", "rank": None}, {"_id": "c", "rank": 2.0}, {"_id": "a"}]
+
+    seen, cursor = [], None
+    while True:
+        docs, cursor = asyncio.run(universities_international._find_page(collection, {}, None, 1, 1, cursor))
+        seen += [d["_id"] for d in docs]
+        if cursor is None:
+            break
+    assert seen == ["a", "b", "c", "d"]
@@ -0,0 +1,31 @@
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """进程内TTL缓存（单worker有效，多worker部署时可替换为Redis）"""
+
+    def __init__(self, ttl: float, maxsize: Optional[int] = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: Dict[Hashable, Tuple[Any, float]] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        value, stored_at = entry
+        if time.monotonic() - stored_at >= self.ttl:
+            self._data.pop(key, None)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data.pop(key, None)
+        # 超出容量时淘汰最早写入的条目（dict保持插入顺序）
+        if self.maxsize is not None and len(self._data) >= self.maxsize:
+            self._data.pop(next(iter(self._data)))
+        self._data[key] = (value, time.monotonic())
+
+    def clear(self) -> None:
+        self._data.clear()
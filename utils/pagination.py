@@ -0,0 +1,103 @@
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+# 列表统一按(rank, _id)排序，_id保证同排名文档的次序稳定，游标分页与page分页顺序一致
+RANK_SORT = [("rank", 1), ("_id", 1)]
+
+
+# rank缺失或为null的文档在升序排序中排在所有数字之前，游标中用此标记表示
+_NULL_RANK = "null"
+
+
+def encode_rank_cursor(doc: dict) -> str:
+    """按(rank, _id)生成keyset分页游标；导入数据中的整数rank可能以float存储，转回int；
+    rank缺失时生成null游标，从其余缺失rank的文档继续翻页，而不是提前结束分页"""
+    rank = doc.get("rank")
+    if rank is None:
+        return f"{_NULL_RANK}_{doc['_id']}"
+    if isinstance(rank, bool) or not isinstance(rank, (int, float)):
+        raise ValueError(f"rank不是数字，无法生成分页游标: {rank!r}")
+    if isinstance(rank, float) and rank.is_integer():
+        rank = int(rank)
+    return f"{rank}_{doc['_id']}"
+
+
+def _parse_rank(rank_str: str):
+    """游标中的rank：整数或小数排名，null标记返回None"""
+    if rank_str == _NULL_RANK:
+        return None
+    try:
+        return int(rank_str)
+    except ValueError:
+        rank = float(rank_str)
+    if not math.isfinite(rank):
+        raise ValueError(rank_str)
+    return rank
+
+
+def decode_rank_cursor(cursor: str) -> dict:
+    """解析游标为keyset查询条件：排在(rank, _id)之后的文档；游标无效时抛出400"""
+    rank_str, _, last_id = cursor.partition("_")
+    try:
+        last_rank = _parse_rank(rank_str)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+    if not last_id:
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+    if ObjectId.is_valid(last_id):
+        last_id = ObjectId(last_id)
+    if last_rank is None:
+        # 其余rank缺失的文档按_id继续，之后是所有有rank的文档
+        return {"$or": [
+            {"rank": None, "_id": {"$gt": last_id}},
+            {"rank": {"$ne": None}},
+        ]}
+    return {"$or": [
+        {"rank": {"$gt": last_rank}},
+        {"rank": last_rank, "_id": {"$gt": last_id}},
+    ]}
+
+
+def apply_rank_cursor(filter_conditions: dict, cursor: str) -> dict:
+    """把游标条件合并进筛选条件（筛选条件已有$or时用$and组合，避免覆盖）"""
+    keyset_conditions = decode_rank_cursor(cursor)
+    if "$or" in filter_conditions:
+        return {"$and": [filter_conditions, keyset_conditions]}
+    return {**filter_conditions, **keyset_conditions}
+
+
+# 评估记录按时间倒序列出，_id保证同一时刻创建的记录次序稳定
+CREATED_DESC_SORT = [("created_at", -1), ("_id", -1)]
+_EPOCH = datetime(1970, 1, 1)
+
+
+def encode_created_cursor(doc: dict) -> Optional[str]:
+    """按(created_at, _id)生成倒序keyset分页游标（created_at取毫秒，与BSON日期精度一致）；created_at缺失时返回None"""
+    created_at = doc.get("created_at")
+    if not isinstance(created_at, datetime):
+        return None
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    millis = (created_at - _EPOCH) // timedelta(milliseconds=1)
+    return f"{millis}_{doc['_id']}"
+
+
+def decode_created_cursor(cursor: str) -> dict:
+    """解析游标为keyset查询条件：排在(created_at, _id)之后（更早）的文档；游标无效时抛出400"""
+    millis_str, _, last_id = cursor.partition("_")
+    try:
+        last_created = _EPOCH + timedelta(milliseconds=int(millis_str))
+    except (ValueError, OverflowError):
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+    if not last_id:
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+    if ObjectId.is_valid(last_id):
+        last_id = ObjectId(last_id)
+    return {"$or": [
+        {"created_at": {"$lt": last_created}},
+        {"created_at": last_created, "_id": {"$lt": last_id}},
+    ]}
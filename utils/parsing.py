@@ -0,0 +1,9 @@
+def parse_list_or_csv(value):
+    """strengths/tags兼容数组或逗号分隔字符串；每条文档都会调用，按最常见的list类型优先判断"""
+    t = type(value)
+    if t is list:
+        return value
+    if t is str:
+        # 每段只strip一次
+        return [s for s in map(str.strip, value.split(',')) if s]
+    return []